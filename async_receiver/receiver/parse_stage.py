@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+import os
+from asyncio import Event, Future, Task, create_task, get_running_loop
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum, unique
+from typing import Any, Awaitable, Callable, Deque, List, Optional
+
+ParserCallable = Callable[[List[bytes]], List[Any]]
+"""
+Convert a batch of raw frames into a list of records.
+Must be picklable (e.g. a module-level function) for :attr:`ParseExecutor.Process`.
+"""
+
+RecordsCallable = Callable[[List[Any]], Awaitable[None]]
+
+DEFAULT_PARSE_BATCH_SIZE = 256
+
+
+@unique
+class ParseExecutor(Enum):
+    Thread = 0
+    """Parse in a :class:`ThreadPoolExecutor`. Suited for parsers that release
+    the GIL (e.g. C extensions)."""
+    Process = 1
+    """Parse in a :class:`ProcessPoolExecutor`."""
+
+
+class ParseStage:
+    """
+    Pipeline stage that parses batches of frames in worker threads or processes.
+
+    Frames are collected into batches of up to ``batch_size`` frames. Full batches
+    are dispatched immediately; a partial batch is dispatched as soon as a worker
+    is idle, so batches grow with the load instead of waiting for a timer.
+    Parsed records are passed to ``sink`` in the order the frames were received.
+
+    :meth:`put` waits while ``max_pending`` batches are in flight, so a slow
+    sink or slow parser pushes back on the reader.
+    """
+
+    def __init__(
+        self,
+        parser: ParserCallable,
+        sink: RecordsCallable,
+        executor=ParseExecutor.Process,
+        workers=0,
+        batch_size=DEFAULT_PARSE_BATCH_SIZE,
+        max_pending=0,
+    ):
+        if batch_size < 1:
+            raise ValueError("The 'batch_size' argument must be greater than 0")
+
+        self._parser = parser
+        self._sink = sink
+        self._executor_type = executor
+        self._workers = workers if workers >= 1 else (os.cpu_count() or 1)
+        self._batch_size = batch_size
+        self._max_pending = max_pending if max_pending >= 1 else self._workers * 2
+
+        self._executor: Optional[Executor] = None
+        self._task: Optional[Task] = None
+        self._batch: List[bytes] = list()
+        self._futures: Deque[Future] = deque()
+        self._ready = Event()
+        self._space = Event()
+        self._idle = Event()
+        self._closing = False
+        self._errors = 0
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size
+
+    @property
+    def errors(self) -> int:
+        """
+        Number of batches discarded because the parser raised an exception.
+        """
+        return self._errors
+
+    def pending(self) -> int:
+        """
+        Number of frames not yet passed to the sink, excluding batches in flight.
+        """
+        return len(self._batch)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self._executor_type == ParseExecutor.Thread:
+                self._executor = ThreadPoolExecutor(max_workers=self._workers)
+            elif self._executor_type == ParseExecutor.Process:
+                self._executor = ProcessPoolExecutor(max_workers=self._workers)
+            else:
+                assert False, "Inaccessible section"
+        return self._executor
+
+    def _dispatch(self, batch: List[bytes]) -> None:
+        loop = get_running_loop()
+        future = loop.run_in_executor(self._get_executor(), self._parser, batch)
+        self._futures.append(future)
+
+    def _dispatch_partial(self) -> None:
+        if self._batch and len(self._futures) < self._workers:
+            batch = self._batch
+            self._batch = list()
+            self._dispatch(batch)
+
+    async def _run(self) -> None:
+        futures = self._futures
+        try:
+            while True:
+                self._dispatch_partial()
+                if not futures:
+                    if self._closing:
+                        break
+                    self._idle.set()
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+
+                try:
+                    records = await futures[0]
+                except Exception:
+                    self._errors += 1
+                    records = None
+                finally:
+                    futures.popleft()
+                    self._space.set()
+
+                if records:
+                    await self._sink(records)
+        finally:
+            # Wake up producers so they can observe the end of the task.
+            self._space.set()
+            self._idle.set()
+
+    def _ensure_task(self) -> Task:
+        if self._task is None:
+            self._closing = False
+            self._task = create_task(self._run())
+        elif self._task.done():
+            self._task.result()
+            raise RuntimeError("The parse stage has been stopped")
+        return self._task
+
+    async def put(self, frames: List[bytes]) -> None:
+        task = self._ensure_task()
+        self._idle.clear()
+        self._batch += frames
+
+        batch_size = self._batch_size
+        while len(self._batch) >= batch_size:
+            while len(self._futures) >= self._max_pending:
+                self._space.clear()
+                await self._space.wait()
+                if task.done():
+                    task.result()
+                    raise RuntimeError("The parse stage has been stopped")
+            batch = self._batch[:batch_size]
+            self._batch = self._batch[batch_size:]
+            self._dispatch(batch)
+
+        self._ready.set()
+
+    async def flush(self) -> None:
+        """
+        Wait until every frame passed to :meth:`put` has been delivered to the sink.
+        """
+        if self._task is None:
+            return
+        while self._batch or self._futures or not self._idle.is_set():
+            if self._task.done():
+                break
+            self._ready.set()
+            await self._idle.wait()
+        if self._task.done():
+            self._task.result()
+
+    async def close(self) -> None:
+        """
+        Deliver the remaining frames, then shut down the workers.
+        """
+        try:
+            if self._task is not None:
+                self._closing = True
+                self._ready.set()
+                try:
+                    await self._task
+                finally:
+                    self._task = None
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
@@ -1,165 +1,258 @@
 # -*- coding: utf-8 -*-
 
-# import os
-# from asyncio import QueueFull
-# from copy import deepcopy
-# from datetime import datetime
-# from random import randint
-# from typing import Dict, Final, List, Optional
-#
-# from async_receiver.subprocess.async_python_subprocess import AsyncPythonSubprocess
-#
-#
-# class ReceiveManager:
-#     def __init__(
-#         self,
-#         dummy=False,
-#         rs232=False,
-#         bluetooth=False,
-#         tcp=False,
-#         udp=False,
-#         sctp=False,
-#         http=False,
-#         ws=False,
-#         grpc=False,
-#     ):
-#         self._dummy = dummy
-#         self._rs232 = rs232
-#         self._bluetooth = bluetooth
-#         self._tcp = tcp
-#         self._udp = udp
-#         self._sctp = sctp
-#         self._http = http
-#         self._ws = ws
-#         self._grpc = grpc
-#
-#         self._modules: Dict[str, ReceiveModule] = dict()
-#
-#     @staticmethod
-#     def discover_dummy() -> List[ReceiveModule]:
-#         return []
-#
-#     @staticmethod
-#     def discover_rs232() -> List[ReceiveModule]:
-#         return []
-#
-#     @staticmethod
-#     def discover_bluetooth() -> List[ReceiveModule]:
-#         return []
-#
-#     @staticmethod
-#     def discover_tcp() -> List[ReceiveModule]:
-#         return []
-#
-#     @staticmethod
-#     def discover_udp() -> List[ReceiveModule]:
-#         return []
-#
-#     @staticmethod
-#     def discover_sctp() -> List[ReceiveModule]:
-#         return []
-#
-#     @staticmethod
-#     def discover_http() -> List[ReceiveModule]:
-#         return []
-#
-#     @staticmethod
-#     def discover_ws() -> List[ReceiveModule]:
-#         return []
-#
-#     @staticmethod
-#     def discover_grpc() -> List[ReceiveModule]:
-#         return []
-#
-#     def discover(self, dry_run=False) -> List[ReceiveModule]:
-#         result = list()
-#         if self._dummy:
-#             result += ReceiveManager.discover_dummy()
-#         if self._rs232:
-#             result += ReceiveManager.discover_rs232()
-#         if self._bluetooth:
-#             result += ReceiveManager.discover_bluetooth()
-#         if self._tcp:
-#             result += ReceiveManager.discover_tcp()
-#         if self._udp:
-#             result += ReceiveManager.discover_udp()
-#         if self._sctp:
-#             result += ReceiveManager.discover_sctp()
-#         if self._http:
-#             result += ReceiveManager.discover_http()
-#         if self._ws:
-#             result += ReceiveManager.discover_ws()
-#         if self._grpc:
-#             result += ReceiveManager.discover_grpc()
-#
-#         if not dry_run:
-#             self._serial_infos = deepcopy(result)
-#
-#         return result
-#
-#     async def bluetooth_stdout(self, data: bytes) -> None:
-#         # print(f"bluetooth_stdout ~~~~~~~~~~~~~~~~~~~~-> {data}")
-#         raws = filter(lambda x: x, data.decode("Latin1").split("\n"))
-#         for raw in raws:
-#             if raw[0] != "E":  # spec
-#                 continue
-#             if raw[1:].isdecimal():
-#                 value = int(raw[1:])
-#             else:
-#                 value = -1
-#             elem = Vibration(datetime.now().astimezone(), value)
-#             try:
-#                 self._bluetooth_queue.put_nowait(elem)
-#             except QueueFull:
-#                 self._bluetooth_queue.get_nowait()
-#                 self._bluetooth_queue.put_nowait(elem)
-#
-#     async def bluetooth_stderr(self, data: bytes) -> None:
-#         # print(f"bluetooth_stderr ~~~~~~~~~~~~~~~~~~~~-> {data}")
-#         pass
-#
-#     async def start_bluetooth(self) -> None:
-#         # print("start_bluetooth !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!")
-#         info = SerialManager.discover_bluetooth()[0]
-#         assert info.name == "HC-06"
-#         assert info.port is not None
-#         assert self._process is None
-#
-#         script = os.path.abspath(bluetooth_recv.__file__)
-#         python = AsyncPythonSubprocess()
-#
-#         self._process = await python.start_python(
-#             script,
-#             info.addr,
-#             str(info.port),
-#             stdout_callback=self.bluetooth_stdout,
-#             stderr_callback=self.bluetooth_stderr,
-#         )
-#
-#     async def close(self) -> None:
-#         if self._process is not None:
-#             self._process.interrupt()
-#             await self._process.wait()
-#             self._process = None
-#
-#     async def latest(self) -> List[State]:
-#         vibrations = list()
-#         while not self._bluetooth_queue.empty():
-#             vibrations.append(self._bluetooth_queue.get_nowait())
-#
-#         if vibrations:
-#             maxvalue = max(map(lambda x: x.value, vibrations))
-#         else:
-#             maxvalue = 0
-#
-#         now = datetime.now().astimezone()
-#         v0 = Vibration(now, randint(0, 100))
-#         v1 = Vibration(now, maxvalue)
-#
-#         info0 = self.discover_fake()[0]
-#         info1 = self.discover_bluetooth()[0]
-#
-#         return [
-#             State(info0.name, "demo", "", [v0]),
-#             State(info1.name, "demo", "", [v1]),
-#         ]
+from asyncio import Event, Semaphore, TimeoutError, gather, wait_for
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from async_receiver.receiver.receiver import Receiver
+from async_receiver.receiver.tcp_receiver import TcpReceiver
+from async_receiver.receiver.udp_receiver import UdpReceiver
+
+TaggedFrame = Tuple[str, bytes]
+"""A frame tagged with the key of the receiver it came from."""
+
+
+class ReceiveManager:
+    """
+    Owns many :class:`Receiver` instances and fans their frames into one stream.
+
+    Frames are appended to a shared bounded deque from a synchronous listener,
+    so no task is created per frame regardless of the number of receivers.
+    """
+
+    def __init__(
+        self,
+        dummy=False,
+        rs232=False,
+        bluetooth=False,
+        tcp=False,
+        udp=False,
+        sctp=False,
+        http=False,
+        ws=False,
+        grpc=False,
+        queue_maxsize=65536,
+        tcp_endpoints: Optional[Iterable[Tuple[str, int]]] = None,
+        udp_endpoints: Optional[Iterable[Tuple[str, int]]] = None,
+    ):
+        if queue_maxsize < 1:
+            raise ValueError("The 'queue_maxsize' argument must be greater than 0")
+
+        self._dummy = dummy
+        self._rs232 = rs232
+        self._bluetooth = bluetooth
+        self._tcp = tcp
+        self._udp = udp
+        self._sctp = sctp
+        self._http = http
+        self._ws = ws
+        self._grpc = grpc
+        self._tcp_endpoints = list(tcp_endpoints) if tcp_endpoints else list()
+        self._udp_endpoints = list(udp_endpoints) if udp_endpoints else list()
+
+        self._receivers: Dict[str, Receiver] = dict()
+        self._keys: Dict[int, str] = dict()
+        self._frames: Deque[TaggedFrame] = deque(maxlen=queue_maxsize)
+        self._event = Event()
+        self._closed = False
+        self._dropped = 0
+
+    @staticmethod
+    def discover_dummy() -> List[Receiver]:
+        return []
+
+    @staticmethod
+    def discover_rs232() -> List[Receiver]:
+        return []
+
+    @staticmethod
+    def discover_bluetooth() -> List[Receiver]:
+        return []
+
+    @staticmethod
+    def discover_tcp(endpoints: Iterable[Tuple[str, int]] = ()) -> List[Receiver]:
+        return [TcpReceiver(address, port) for address, port in endpoints]
+
+    @staticmethod
+    def discover_udp(endpoints: Iterable[Tuple[str, int]] = ()) -> List[Receiver]:
+        return [UdpReceiver(address, port) for address, port in endpoints]
+
+    @staticmethod
+    def discover_sctp() -> List[Receiver]:
+        return []
+
+    @staticmethod
+    def discover_http() -> List[Receiver]:
+        return []
+
+    @staticmethod
+    def discover_ws() -> List[Receiver]:
+        return []
+
+    @staticmethod
+    def discover_grpc() -> List[Receiver]:
+        return []
+
+    def discover(self, dry_run=False) -> List[Receiver]:
+        result = list()
+        if self._dummy:
+            result += ReceiveManager.discover_dummy()
+        if self._rs232:
+            result += ReceiveManager.discover_rs232()
+        if self._bluetooth:
+            result += ReceiveManager.discover_bluetooth()
+        if self._tcp:
+            result += ReceiveManager.discover_tcp(self._tcp_endpoints)
+        if self._udp:
+            result += ReceiveManager.discover_udp(self._udp_endpoints)
+        if self._sctp:
+            result += ReceiveManager.discover_sctp()
+        if self._http:
+            result += ReceiveManager.discover_http()
+        if self._ws:
+            result += ReceiveManager.discover_ws()
+        if self._grpc:
+            result += ReceiveManager.discover_grpc()
+
+        if not dry_run:
+            for receiver in result:
+                self.add(receiver)
+
+        return result
+
+    @property
+    def receivers(self) -> Dict[str, Receiver]:
+        return self._receivers
+
+    @property
+    def dropped(self) -> int:
+        """
+        Number of tagged frames discarded because the consumer fell behind.
+        """
+        return self._dropped
+
+    def __len__(self) -> int:
+        return len(self._receivers)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._receivers
+
+    def __getitem__(self, key: str) -> Receiver:
+        return self._receivers[key]
+
+    def add(self, receiver: Receiver, key: Optional[str] = None) -> str:
+        if not key:
+            key = receiver.name
+        if not key:
+            raise ValueError("The receiver key or receiver name is required")
+        if key in self._receivers:
+            raise KeyError(f"Already exists receiver key: '{key}'")
+
+        self._receivers[key] = receiver
+        self._keys[id(receiver)] = key
+        receiver.add_listener(self._on_frame)
+        return key
+
+    def remove(self, key: str) -> Receiver:
+        receiver = self._receivers.pop(key)
+        del self._keys[id(receiver)]
+        receiver.remove_listener(self._on_frame)
+        return receiver
+
+    def _on_frame(self, receiver: Receiver, data: bytes) -> None:
+        frames = self._frames
+        if len(frames) == frames.maxlen:
+            self._dropped += 1
+        frames.append((self._keys[id(receiver)], data))
+        self._event.set()
+
+    async def open(self, max_concurrency=0) -> Dict[str, BaseException]:
+        """
+        Open all receivers that are not opened yet.
+
+        :param max_concurrency:
+            Maximum number of receivers opened at the same time.
+            Values less than 1 mean unlimited.
+        :return:
+            Exceptions raised by the receivers that failed to open, by key.
+        """
+        self._closed = False
+        semaphore = Semaphore(max_concurrency) if max_concurrency >= 1 else None
+
+        async def _open(receiver: Receiver) -> None:
+            if semaphore is None:
+                await receiver.open()
+            else:
+                async with semaphore:
+                    await receiver.open()
+
+        keys = [k for k, r in self._receivers.items() if not r.opened]
+        coroutines = [_open(self._receivers[k]) for k in keys]
+        results = await gather(*coroutines, return_exceptions=True)
+        return {k: e for k, e in zip(keys, results) if isinstance(e, BaseException)}
+
+    async def close(self, timeout: Optional[float] = None) -> Dict[str, int]:
+        """
+        Close all opened receivers.
+
+        :return:
+            Exit codes of the closed receivers, by key.
+        """
+        keys = [k for k, r in self._receivers.items() if r.opened]
+        coroutines = [self._receivers[k].close(timeout) for k in keys]
+        results = await gather(*coroutines)
+        self._closed = True
+        self._event.set()
+        return dict(zip(keys, results))
+
+    def is_empty(self) -> bool:
+        return not self._frames
+
+    def clear(self) -> None:
+        self._frames.clear()
+
+    def pop_nowait(self) -> TaggedFrame:
+        return self._frames.popleft()
+
+    def pop_all_nowait(self) -> List[TaggedFrame]:
+        result = list(self._frames)
+        self._frames.clear()
+        return result
+
+    async def get_many(
+        self,
+        max_n: int,
+        timeout: Optional[float] = None,
+    ) -> List[TaggedFrame]:
+        """
+        Wait until at least one frame is available,
+        then return everything available up to ``max_n`` frames.
+
+        An empty list is returned if the ``timeout`` expires.
+        """
+        if max_n < 1:
+            raise ValueError("The 'max_n' argument must be greater than 0")
+
+        frames = self._frames
+        while not frames and not self._closed:
+            self._event.clear()
+            try:
+                await wait_for(self._event.wait(), timeout)
+            except TimeoutError:
+                return []
+
+        if len(frames) <= max_n:
+            return self.pop_all_nowait()
+        return [frames.popleft() for _ in range(max_n)]
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> TaggedFrame:
+        frames = self._frames
+        while not frames:
+            if self._closed:
+                raise StopAsyncIteration
+            self._event.clear()
+            await self._event.wait()
+        return frames.popleft()
@@ -1,21 +1,58 @@
 # -*- coding: utf-8 -*-
 
 import os
-from asyncio import Queue
-from typing import Awaitable, Callable, List, Mapping, Optional, Union
+import sys
+from asyncio import CancelledError, Event, Queue, Task, create_task, sleep
+from enum import Enum, unique
+from inspect import iscoroutinefunction
+from multiprocessing.shared_memory import SharedMemory
+from typing import Awaitable, Callable, List, Mapping, Optional, Tuple, Union, cast
 
+from async_receiver.receiver.parse_stage import (
+    DEFAULT_PARSE_BATCH_SIZE,
+    ParseExecutor,
+    ParserCallable,
+    ParseStage,
+)
+from async_receiver.receiver.ring_buffer import RingBuffer
+from async_receiver.receiver.shm_ring import (
+    SHM_NAME_ENVIRON,
+    SharedRing,
+    attach_shared_ring,
+    create_shared_ring,
+)
+from async_receiver.subprocess.async_python_subprocess import AsyncPythonSubprocess
 from async_receiver.subprocess.async_subprocess import (
+    AnyReaderCallable,
     AsyncSubprocess,
     ReaderMethod,
     SubprocessMethod,
 )
+from async_receiver.subprocess.async_virtual_environment import AsyncVirtualEnvironment
+from async_receiver.subprocess.framing import FrameCodec
 
 ReceiverCallable = Callable[["Receiver", bytes], Union[Awaitable[None], None]]
 
+SHM_NOTIFY_READ_SIZE = 4096
+BATCH_READER_METHODS = (ReaderMethod.ReadLines, ReaderMethod.ReadFrames)
+
+
+@unique
+class OverflowPolicy(Enum):
+    DropOldest = 0
+    """Discard the oldest frame to make room for the new one."""
+    DropNewest = 1
+    """Discard the new frame."""
+    Block = 2
+    """Stop reading the subprocess pipe until a consumer makes room."""
+    CoalesceLatest = 3
+    """Keep only the newest frame."""
+
 
 class Receiver:
 
     _queue: Optional[Queue[bytes]]
+    _ring: Optional[RingBuffer]
     _process: Optional[AsyncSubprocess]
 
     def __init__(
@@ -40,17 +77,65 @@ class Receiver:
         stderr_chunk_size=-1,
         stdout_separator=b"\n",
         stderr_separator=b"\n",
+        stdout_max_batch_size=0,
+        stderr_max_batch_size=0,
+        stdout_max_linger=0.0,
+        stderr_max_linger=0.0,
+        stdout_codec: Optional[FrameCodec] = None,
+        stderr_codec: Optional[FrameCodec] = None,
         receive_byte=1024,
         receive_duration=1.0,
         data_callback: Optional[ReceiverCallable] = None,
         error_callback: Optional[ReceiverCallable] = None,
         queue_maxsize=1024,
+        queue_maxbytes=0,
+        overflow_policy=OverflowPolicy.DropOldest,
+        shm_size=0,
+        shm_poll_interval=0.1,
+        parser: Optional[ParserCallable] = None,
+        parser_executor=ParseExecutor.Process,
+        parser_workers=0,
+        parser_batch_size=DEFAULT_PARSE_BATCH_SIZE,
     ):
+        """
+        :param queue_maxsize:
+            Maximum number of frames kept in the history.
+            If less than 1, no history is kept.
+        :param queue_maxbytes:
+            If greater than 0, the history is kept in a preallocated
+            :class:`RingBuffer` of this many bytes instead of an :class:`Queue`.
+        :param overflow_policy:
+            What to do with a new frame when the history is full.
+        :param shm_size:
+            If greater than 0, the receiver script writes frames into a shared
+            memory ring of this many bytes (see
+            :class:`async_receiver.receiver.shm_writer.ShmWriter`) and stdout only
+            carries wake-up notifications. With ring buffer storage and no
+            listeners, frames are passed to ``data_callback`` as
+            :class:`memoryview` objects that are only valid during the call.
+        :param shm_poll_interval:
+            Interval in seconds at which the shared memory ring is drained even
+            without a notification.
+        :param parser:
+            If set, batches of stdout frames are parsed by this function in a
+            worker pool (see :class:`ParseStage`), and the parsed records are
+            stored in the history and passed to the callbacks in place of the raw
+            frames, in the original order.
+        :param parser_executor:
+            Run the parser in worker threads or worker processes.
+        :param parser_workers:
+            Number of workers. If less than 1, the number of CPUs is used.
+        :param parser_batch_size:
+            Maximum number of frames sent to a worker at once.
+        """
+
         if venv_requirements and venv_requirements_file:
             raise ValueError(
                 "Arguments 'venv_requirements' and "
                 "'venv_requirements_file' cannot coexist"
             )
+        if parser is not None and queue_maxbytes >= 1:
+            raise ValueError("Arguments 'parser' and 'queue_maxbytes' cannot coexist")
 
         self._category = category
         self._name = name
@@ -74,65 +159,428 @@ class Receiver:
         self._stderr_chunk_size = stderr_chunk_size
         self._stdout_separator = stdout_separator
         self._stderr_separator = stderr_separator
+        self._stdout_max_batch_size = stdout_max_batch_size
+        self._stderr_max_batch_size = stderr_max_batch_size
+        self._stdout_max_linger = stdout_max_linger
+        self._stderr_max_linger = stderr_max_linger
+        self._stdout_codec = stdout_codec
+        self._stderr_codec = stderr_codec
 
         self._receive_byte = receive_byte
         self._receive_duration = receive_duration
 
         self._data_callback = data_callback
         self._error_callback = error_callback
+        self._listeners: List[ReceiverCallable] = list()
+
+        if queue_maxsize >= 1 and queue_maxbytes >= 1:
+            self._queue = None
+            self._ring = RingBuffer(queue_maxbytes, queue_maxsize)
+        elif queue_maxsize >= 1:
+            self._queue = Queue(maxsize=queue_maxsize)
+            self._ring = None
+        else:
+            self._queue = None
+            self._ring = None
+
+        self._overflow_policy = overflow_policy
+        self._shm_size = shm_size
+        self._shm_poll_interval = shm_poll_interval
+        self._shm: Optional[SharedMemory] = None
+        self._shm_ring: Optional[SharedRing] = None
+        self._shm_poll_task: Optional[Task] = None
+        self._shm_draining = False
+        self._space_event = Event()
+        self._dropped = 0
+        self._blocked = 0
+
+        self._parse_stage: Optional[ParseStage] = None
+        if parser is not None:
+            self._parse_stage = ParseStage(
+                parser,
+                self._receiver_stdout_lines,
+                executor=parser_executor,
+                workers=parser_workers,
+                batch_size=parser_batch_size,
+            )
 
-        self._queue = Queue(maxsize=queue_maxsize) if queue_maxsize >= 1 else None
         self._process = None
+        self._pending_frames: List[bytes] = list()
+        self._deliver_task: Optional[Task] = None
+
+    @property
+    def category(self) -> Optional[str]:
+        return self._category
+
+    @property
+    def name(self) -> Optional[str]:
+        return self._name
+
+    @property
+    def description(self) -> Optional[str]:
+        return self._description
+
+    @property
+    def address(self) -> Optional[str]:
+        return self._address
+
+    @property
+    def port(self) -> Optional[int]:
+        return self._port
+
+    @property
+    def opened(self) -> bool:
+        return self._process is not None
+
+    def add_listener(self, listener: ReceiverCallable) -> None:
+        """
+        Register an additional callback that is called for every received frame,
+        after the frame has been stored in the history.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: ReceiverCallable) -> None:
+        self._listeners.remove(listener)
+
+    @property
+    def overflow_policy(self) -> OverflowPolicy:
+        return self._overflow_policy
+
+    @property
+    def dropped(self) -> int:
+        """
+        Number of frames discarded by the overflow policy.
+        """
+        return self._dropped
+
+    @property
+    def blocked(self) -> int:
+        """
+        Number of frames that had to wait for room in the history.
+        """
+        return self._blocked
+
+    def _notify_space(self) -> None:
+        self._space_event.set()
+
+    async def _wait_space(self) -> None:
+        self._space_event.clear()
+        await self._space_event.wait()
+
+    async def _put_ring(self, ring: RingBuffer, data: bytes) -> None:
+        policy = self._overflow_policy
+        if policy == OverflowPolicy.DropOldest:
+            self._dropped += ring.put_nowait(data)
+        elif policy == OverflowPolicy.DropNewest:
+            if ring.fits(len(data)):
+                ring.put_nowait(data)
+            else:
+                self._dropped += 1
+        elif policy == OverflowPolicy.Block:
+            if not ring.fits(len(data)) and not ring.empty():
+                self._blocked += 1
+                while not ring.fits(len(data)) and not ring.empty():
+                    await self._wait_space()
+            ring.put_nowait(data)
+        elif policy == OverflowPolicy.CoalesceLatest:
+            self._dropped += ring.qsize()
+            ring.clear()
+            ring.put_nowait(data)
+        else:
+            assert False, "Inaccessible section"
+
+    async def _put_queue(self, queue: Queue[bytes], data: bytes) -> None:
+        policy = self._overflow_policy
+        if policy == OverflowPolicy.DropOldest:
+            if queue.full():
+                queue.get_nowait()
+                self._dropped += 1
+            queue.put_nowait(data)
+        elif policy == OverflowPolicy.DropNewest:
+            if queue.full():
+                self._dropped += 1
+            else:
+                queue.put_nowait(data)
+        elif policy == OverflowPolicy.Block:
+            if queue.full():
+                self._blocked += 1
+            await queue.put(data)
+        elif policy == OverflowPolicy.CoalesceLatest:
+            while not queue.empty():
+                queue.get_nowait()
+                self._dropped += 1
+            queue.put_nowait(data)
+        else:
+            assert False, "Inaccessible section"
+
+    async def _put(self, data: bytes) -> None:
+        if self._ring is not None:
+            await self._put_ring(self._ring, data)
+        elif self._queue is not None:
+            await self._put_queue(self._queue, data)
 
     async def _receiver_stdout(self, data: bytes) -> None:
-        if self._queue:
-            if self._queue.full():
-                self._queue.get_nowait()
-            self._queue.put_nowait(data)
+        await self._put(data)
 
         if self._data_callback:
-            self._data_callback(self, data)
+            if iscoroutinefunction(self._data_callback):
+                await self._data_callback(self, data)
+            else:
+                self._data_callback(self, data)
+
+        for listener in self._listeners:
+            if iscoroutinefunction(listener):
+                await listener(self, data)
+            else:
+                listener(self, data)
+
+    async def _receiver_stdout_lines(self, frames: List[bytes]) -> None:
+        for frame in frames:
+            await self._receiver_stdout(frame)
+
+    async def _receiver_stdout_parse(self, data: bytes) -> None:
+        assert self._parse_stage is not None
+        await self._parse_stage.put([data])
+
+    async def _receive_frames(self, frames: List[bytes]) -> None:
+        if self._parse_stage is not None:
+            await self._parse_stage.put(frames)
+        else:
+            await self._receiver_stdout_lines(frames)
+
+    @property
+    def parse_stage(self) -> ParseStage:
+        if self._parse_stage is None:
+            raise RuntimeError("Not ready parse stage")
+        return self._parse_stage
+
+    async def _flush_parse_stage(self) -> None:
+        if self._parse_stage is not None:
+            await self._parse_stage.flush()
+
+    async def _close_parse_stage(self) -> None:
+        if self._parse_stage is not None:
+            await self._parse_stage.close()
+
+    def _enqueue_frames(self, frames: List[bytes]) -> int:
+        """
+        Deliver frames received outside of a coroutine (e.g. from a protocol
+        callback) in order, using at most one task at a time.
+
+        :return:
+            Number of frames waiting for delivery.
+        """
+        self._pending_frames += frames
+        if self._deliver_task is None:
+            self._deliver_task = create_task(self._deliver_frames())
+        return len(self._pending_frames)
+
+    async def _deliver_frames(self) -> None:
+        try:
+            while self._pending_frames:
+                frames = self._pending_frames
+                self._pending_frames = list()
+                await self._receive_frames(frames)
+        finally:
+            self._deliver_task = None
 
     async def _receiver_stderr(self, data: bytes) -> None:
         if self._error_callback:
-            self._error_callback(self, data)
+            if iscoroutinefunction(self._error_callback):
+                await self._error_callback(self, data)
+            else:
+                self._error_callback(self, data)
+
+    async def _receiver_stderr_lines(self, frames: List[bytes]) -> None:
+        for frame in frames:
+            await self._receiver_stderr(frame)
+
+    def _open_shm(self) -> None:
+        assert self._shm is None
+        self._shm = create_shared_ring(self._shm_size)
+        self._shm_ring = attach_shared_ring(self._shm)
+
+    async def _close_shm(self) -> None:
+        if self._shm_poll_task is not None:
+            self._shm_poll_task.cancel()
+            try:
+                await self._shm_poll_task
+            except CancelledError:
+                pass
+            self._shm_poll_task = None
+
+        if self._shm_ring is not None:
+            await self._drain_shm()
+            self._shm_ring.release_buffer()
+            self._shm_ring = None
+
+        if self._shm is not None:
+            try:
+                self._shm.close()
+            except BufferError:
+                # A callback kept a frame view; the mapping is freed with it.
+                pass
+            self._shm.unlink()
+            self._shm = None
+
+    async def _drain_shm(self) -> None:
+        ring = self._shm_ring
+        if ring is None or self._shm_draining:
+            return
+
+        self._shm_draining = True
+        try:
+            zero_copy = self._ring is not None and not self._listeners
+            while True:
+                views = ring.read_views()
+                if not views:
+                    break
+                if self._parse_stage is not None:
+                    await self._parse_stage.put([bytes(view) for view in views])
+                    for view in views:
+                        view.release()
+                    ring.release()
+                    continue
+                for view in views:
+                    if zero_copy:
+                        await self._receiver_stdout(cast(bytes, view))
+                    else:
+                        await self._receiver_stdout(bytes(view))
+                    view.release()
+                ring.release()
+        finally:
+            self._shm_draining = False
+
+    async def _poll_shm(self) -> None:
+        while True:
+            await sleep(self._shm_poll_interval)
+            await self._drain_shm()
+
+    async def _receiver_shm_notify(self, data: bytes) -> None:
+        await self._drain_shm()
+
+    async def _create_python(self) -> AsyncPythonSubprocess:
+        if not self._venv_root:
+            return AsyncPythonSubprocess(
+                executable=sys.executable,
+                pip_timeout=self._venv_pip_timeout if self._venv_pip_timeout else 0.0,
+                env=self._env,
+                method=self._method,
+            )
+
+        venv = AsyncVirtualEnvironment(
+            self._venv_root, pip_timeout=self._venv_pip_timeout
+        )
+        await venv.create_if_not_exists()
+
+        python = venv.create_python_subprocess()
+        python.env = self._env
+        python.method = self._method
+
+        if self._venv_requirements:
+            await python.start_pip_simply("install", *self._venv_requirements)
+        if self._venv_requirements_file:
+            await python.start_pip_simply("install", "-r", self._venv_requirements_file)
+        return python
 
     async def open(self) -> None:
         if not self._receiver_script:
-            raise ValueError("")
+            raise ValueError("The 'receiver_script' argument is required")
 
         if not os.path.isfile(self._receiver_script):
-            raise FileNotFoundError()
+            raise FileNotFoundError(
+                f"Not found receiver script: '{self._receiver_script}'"
+            )
+
+        if self._process is not None:
+            raise RuntimeError("Already opened process")
 
         assert isinstance(self._receive_byte, int)
         assert isinstance(self._receive_duration, float)
         assert self._receive_byte >= 1
         assert self._receive_duration >= 0.0
 
-        # python = AsyncPythonSubprocess(
-        #     executable=sys.executable,
-        #     pip_timeout=self.venv_pip_timeout,
-        #     env=env,
-        #     method=method,
-        # )
-        #
-        # self._process = await self._python.start_python(
-        #     self.receiver_script,
-        #     self.address,
-        #     str(self.port),
-        #     str(self.receive_byte),
-        #     str(self.receive_duration),
-        #     stdout_callback=self.receiver_stdout,
-        #     stderr_callback=self.receiver_stderr,
-        #     stdout_reader_method=self.
-        # )
+        stdout_callback: AnyReaderCallable
+        if self._stdout_reader_method in BATCH_READER_METHODS:
+            stdout_callback = self._receive_frames
+        elif self._parse_stage is not None:
+            stdout_callback = self._receiver_stdout_parse
+        else:
+            stdout_callback = self._receiver_stdout
+
+        stderr_callback: AnyReaderCallable
+        if self._stderr_reader_method in BATCH_READER_METHODS:
+            stderr_callback = self._receiver_stderr_lines
+        else:
+            stderr_callback = self._receiver_stderr
+
+        stdout_reader_method = self._stdout_reader_method
+        stdout_chunk_size = self._stdout_chunk_size
+
+        python = await self._create_python()
+        if self._shm_size >= 1:
+            self._open_shm()
+            assert self._shm is not None
+            env = dict(self._env if self._env is not None else os.environ)
+            env[SHM_NAME_ENVIRON] = self._shm.name
+            python.env = env
+            stdout_callback = self._receiver_shm_notify
+            stdout_reader_method = ReaderMethod.Read
+            stdout_chunk_size = SHM_NOTIFY_READ_SIZE
+
+        try:
+            self._process = await python.start_python(
+                self._receiver_script,
+                self._address if self._address else "",
+                str(self._port) if self._port is not None else "",
+                str(self._receive_byte),
+                str(self._receive_duration),
+                cwd=self._cwd,
+                stdout_callback=stdout_callback,
+                stderr_callback=stderr_callback,
+                stdout_reader_method=stdout_reader_method,
+                stderr_reader_method=self._stderr_reader_method,
+                stdout_chunk_size=stdout_chunk_size,
+                stderr_chunk_size=self._stderr_chunk_size,
+                stdout_separator=self._stdout_separator,
+                stderr_separator=self._stderr_separator,
+                stdout_max_batch_size=self._stdout_max_batch_size,
+                stderr_max_batch_size=self._stderr_max_batch_size,
+                stdout_max_linger=self._stdout_max_linger,
+                stderr_max_linger=self._stderr_max_linger,
+                stdout_codec=self._stdout_codec,
+                stderr_codec=self._stderr_codec,
+            )
+        except BaseException:
+            await self._close_shm()
+            raise
+
+        if self._shm_ring is not None:
+            self._shm_poll_task = create_task(self._poll_shm())
 
     async def close(self, timeout: Optional[float] = None) -> int:
         if timeout is not None and timeout <= 0:
             raise ValueError("The 'timeout' argument must be None or greater than 0")
         if self._process is None:
             raise RuntimeError("Not ready process")
-        return await self._process.force_quit(timeout)
+        try:
+            return await self._process.force_quit(timeout)
+        finally:
+            self._process = None
+            await self._close_shm()
+            await self._close_parse_stage()
+
+    @property
+    def process(self) -> AsyncSubprocess:
+        if self._process is None:
+            raise RuntimeError("Not ready process")
+        return self._process
+
+    async def wait(self, timeout: Optional[float] = None) -> int:
+        exit_code = await self.process.wait(timeout)
+        await self._drain_shm()
+        await self._flush_parse_stage()
+        return exit_code
 
     @property
     def queue(self) -> Queue[bytes]:
@@ -140,21 +588,69 @@ class Receiver:
             raise RuntimeError("Not ready queue")
         return self._queue
 
+    @property
+    def ring(self) -> RingBuffer:
+        if self._ring is None:
+            raise RuntimeError("Not ready ring buffer")
+        return self._ring
+
     def is_full(self) -> bool:
+        if self._ring is not None:
+            return self._ring.full()
         return self.queue.full()
 
     def is_empty(self) -> bool:
+        if self._ring is not None:
+            return self._ring.empty()
         return self.queue.empty()
 
     def clear(self) -> None:
+        if self._ring is not None:
+            self._ring.clear()
+            self._notify_space()
+            return
         while not self.queue.empty():
             self.queue.get_nowait()
 
     def pop_nowait(self) -> bytes:
+        if self._ring is not None:
+            result = self._ring.get_nowait()
+            self._notify_space()
+            return result
         return self.queue.get_nowait()
 
     def pop_all_nowait(self) -> List[bytes]:
+        if self._ring is not None:
+            result = [bytes(view) for view in self._ring.get_all_views()]
+            self._notify_space()
+            return result
         result = list()
         while not self.queue.empty():
             result.append(self.queue.get_nowait())
         return result
+
+    def pop_all_views(self) -> List[memoryview]:
+        """
+        Remove all frames and return them without copying.
+
+        .. warning::
+            With ring buffer storage, the views are only valid until the next frame
+            is received.
+        """
+        if self._ring is not None:
+            views = self._ring.get_all_views()
+            self._notify_space()
+            return views
+        return [memoryview(frame) for frame in self.pop_all_nowait()]
+
+    def pop_all_joined(self) -> Tuple[bytes, List[int]]:
+        """
+        Remove all frames and return them as one contiguous copy,
+        along with the length of each frame.
+        """
+        if self._ring is not None:
+            joined = self._ring.get_all_joined()
+            self._notify_space()
+            return joined
+        frames = self.pop_all_nowait()
+        return b"".join(frames), [len(frame) for frame in frames]
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+from array import array
+from asyncio import QueueEmpty
+from typing import List, Tuple
+
+
+class RingBuffer:
+    """
+    Frame ring buffer bounded by both the number of frames and the number of bytes.
+
+    Payloads are stored in one preallocated :class:`bytearray` and indexed by
+    ``offset``/``length`` arrays, so pushing into a full buffer drops the oldest
+    frame in O(1) without allocating.
+    """
+
+    def __init__(self, max_bytes: int, max_frames: int):
+        if max_bytes < 1:
+            raise ValueError("The 'max_bytes' argument must be greater than 0")
+        if max_frames < 1:
+            raise ValueError("The 'max_frames' argument must be greater than 0")
+
+        self._data = bytearray(max_bytes)
+        self._view = memoryview(self._data)
+        self._offsets = array("q", [0]) * max_frames
+        self._lengths = array("q", [0]) * max_frames
+        self._max_bytes = max_bytes
+        self._max_frames = max_frames
+
+        self._head = 0
+        """Slot index of the oldest frame."""
+        self._count = 0
+        self._write = 0
+        """Byte offset just past the newest frame."""
+        self._wrapped = False
+        """The newest frames were written in front of the oldest frames."""
+        self._nbytes = 0
+        self._dropped = 0
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @property
+    def max_frames(self) -> int:
+        return self._max_frames
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Number of payload bytes currently stored.
+        """
+        return self._nbytes
+
+    @property
+    def dropped(self) -> int:
+        """
+        Number of frames discarded to make room for newer frames.
+        """
+        return self._dropped
+
+    def __len__(self) -> int:
+        return self._count
+
+    def qsize(self) -> int:
+        return self._count
+
+    def empty(self) -> bool:
+        return self._count == 0
+
+    def full(self) -> bool:
+        return self._count == self._max_frames
+
+    def _advance(self) -> None:
+        head = self._head
+        offset = self._offsets[head]
+        self._nbytes -= self._lengths[head]
+        self._head = (head + 1) % self._max_frames
+        self._count -= 1
+
+        if self._count == 0:
+            self._write = 0
+            self._wrapped = False
+        elif self._wrapped and self._offsets[self._head] < offset:
+            self._wrapped = False
+
+    def _drop_oldest(self) -> None:
+        self._advance()
+        self._dropped += 1
+
+    def _find_space(self, size: int) -> int:
+        if self._count == 0:
+            return 0
+        if self._count == self._max_frames:
+            return -1
+
+        head_offset = self._offsets[self._head]
+        if self._wrapped:
+            if self._write + size <= head_offset:
+                return self._write
+        else:
+            if self._write + size <= self._max_bytes:
+                return self._write
+            if size <= head_offset:
+                return 0
+        return -1
+
+    def fits(self, size: int) -> bool:
+        """
+        Whether a frame of ``size`` bytes can be stored without dropping frames.
+        """
+        return 0 <= size <= self._max_bytes and self._find_space(size) >= 0
+
+    def put_nowait(self, data: bytes) -> int:
+        """
+        Store a frame, dropping the oldest frames if there is not enough room.
+
+        :return:
+            Number of frames dropped.
+        """
+        size = len(data)
+        if size > self._max_bytes:
+            raise ValueError(
+                f"The frame size ({size}) exceeds the buffer size ({self._max_bytes})"
+            )
+
+        dropped = self._dropped
+        offset = self._find_space(size)
+        while offset < 0:
+            self._drop_oldest()
+            offset = self._find_space(size)
+
+        if self._count and offset < self._write:
+            self._wrapped = True
+
+        end = offset + size
+        self._view[offset:end] = data
+
+        slot = (self._head + self._count) % self._max_frames
+        self._offsets[slot] = offset
+        self._lengths[slot] = size
+        self._count += 1
+        self._nbytes += size
+        self._write = end
+        return self._dropped - dropped
+
+    def _head_view(self) -> memoryview:
+        offset = self._offsets[self._head]
+        return self._view[offset : offset + self._lengths[self._head]]
+
+    def peek_nowait(self) -> memoryview:
+        if self._count == 0:
+            raise QueueEmpty
+        return self._head_view()
+
+    def get_nowait(self) -> bytes:
+        if self._count == 0:
+            raise QueueEmpty
+        result = bytes(self._head_view())
+        self._advance()
+        return result
+
+    def drop_nowait(self, count=1) -> int:
+        """
+        Discard up to ``count`` of the oldest frames.
+
+        :return:
+            Number of frames dropped.
+        """
+        dropped = min(max(count, 0), self._count)
+        for _ in range(dropped):
+            self._drop_oldest()
+        return dropped
+
+    def get_all_views(self) -> List[memoryview]:
+        """
+        Remove all frames and return them as views of the internal buffer.
+
+        .. warning::
+            The views are only valid until the next call to :meth:`put_nowait`.
+        """
+        result = list()
+        while self._count:
+            result.append(self._head_view())
+            self._advance()
+        return result
+
+    def get_all_joined(self) -> Tuple[bytes, List[int]]:
+        """
+        Remove all frames and return them as one contiguous copy,
+        along with the length of each frame.
+        """
+        lengths = [
+            self._lengths[(self._head + i) % self._max_frames]
+            for i in range(self._count)
+        ]
+        return b"".join(self.get_all_views()), lengths
+
+    def clear(self) -> None:
+        self._head = 0
+        self._count = 0
+        self._write = 0
+        self._wrapped = False
+        self._nbytes = 0
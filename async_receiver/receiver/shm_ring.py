@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Single-producer/single-consumer frame ring in a shared memory block.
+
+Only the standard library is used, so receiver scripts can use it as well.
+
+Memory layout (little-endian)::
+
+    [0:8]     magic
+    [8:16]    data capacity in bytes
+    [64:72]   tail: total bytes written (producer-owned)
+    [128:136] head: total bytes released (consumer-owned)
+    [192:200] frames dropped by the producer because the ring was full
+    [256:]    records
+
+Each record is an 8-byte header (``uint32`` payload length, ``uint32`` reserved)
+followed by the payload padded to 8 bytes. A record never wraps around the end of
+the data area; the remaining bytes are skipped with a :data:`WRAP_MARKER` header.
+
+.. warning::
+    Counters are published with plain aligned 8-byte stores, which are not
+    guaranteed to be ordered on every architecture. The consumer should therefore
+    poll periodically in addition to reacting to notifications.
+"""
+
+from multiprocessing.shared_memory import SharedMemory
+from struct import Struct
+from typing import Final, List
+
+SHM_NAME_ENVIRON: Final[str] = "ASYNC_RECEIVER_SHM_NAME"
+
+MAGIC: Final[int] = 0x474E495252534152  # "RASRRING"
+HEADER_SIZE: Final[int] = 256
+MAGIC_OFFSET: Final[int] = 0
+CAPACITY_OFFSET: Final[int] = 8
+TAIL_OFFSET: Final[int] = 64
+HEAD_OFFSET: Final[int] = 128
+DROPPED_OFFSET: Final[int] = 192
+
+RECORD_HEADER_SIZE: Final[int] = 8
+WRAP_MARKER: Final[int] = 0xFFFFFFFF
+
+_U64: Final[Struct] = Struct("<Q")
+_RECORD_HEADER: Final[Struct] = Struct("<II")
+
+
+def align8(size: int) -> int:
+    return (size + 7) & ~7
+
+
+def record_size(size: int) -> int:
+    return RECORD_HEADER_SIZE + align8(size)
+
+
+class SharedRing:
+    def __init__(self, buffer: memoryview):
+        if len(buffer) < HEADER_SIZE:
+            raise ValueError("The buffer is smaller than the ring header")
+        self._buffer = buffer[:]
+        self._capacity = _U64.unpack_from(buffer, CAPACITY_OFFSET)[0]
+        if _U64.unpack_from(buffer, MAGIC_OFFSET)[0] != MAGIC:
+            raise ValueError("The buffer is not an initialized shared ring")
+        if HEADER_SIZE + self._capacity > len(buffer):
+            raise ValueError("The ring capacity exceeds the buffer size")
+        self._data = self._buffer[HEADER_SIZE : HEADER_SIZE + self._capacity]
+        self._tail = self._load(TAIL_OFFSET)
+        self._head = self._load(HEAD_OFFSET)
+        self._read_to = self._head
+
+    @staticmethod
+    def initialize(buffer: memoryview) -> "SharedRing":
+        capacity = (len(buffer) - HEADER_SIZE) & ~7
+        if capacity < RECORD_HEADER_SIZE:
+            raise ValueError("The buffer is too small for a shared ring")
+        buffer[:HEADER_SIZE] = bytes(HEADER_SIZE)
+        _U64.pack_into(buffer, CAPACITY_OFFSET, capacity)
+        _U64.pack_into(buffer, MAGIC_OFFSET, MAGIC)
+        return SharedRing(buffer)
+
+    def _load(self, offset: int) -> int:
+        return _U64.unpack_from(self._buffer, offset)[0]
+
+    def _store(self, offset: int, value: int) -> None:
+        _U64.pack_into(self._buffer, offset, value)
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def head(self) -> int:
+        return self._load(HEAD_OFFSET)
+
+    @property
+    def tail(self) -> int:
+        return self._load(TAIL_OFFSET)
+
+    @property
+    def dropped(self) -> int:
+        return self._load(DROPPED_OFFSET)
+
+    def release_buffer(self) -> None:
+        """
+        Release the views of the shared memory so that it can be closed.
+        """
+        self._data.release()
+        self._buffer.release()
+
+    # ----------------
+    # Producer methods
+    # ----------------
+
+    def write(self, data: bytes) -> bool:
+        """
+        Append a frame.
+
+        :return:
+            ``False`` if the ring was full and the frame was dropped.
+        """
+        size = len(data)
+        record = record_size(size)
+        capacity = self._capacity
+        if record > capacity:
+            raise ValueError(f"The frame size ({size}) exceeds the ring capacity")
+
+        tail = self._tail
+        position = tail % capacity
+        contiguous = capacity - position
+        skip = contiguous if record > contiguous else 0
+
+        if tail + skip + record - self._load(HEAD_OFFSET) > capacity:
+            self._store(DROPPED_OFFSET, self._load(DROPPED_OFFSET) + 1)
+            return False
+
+        if skip:
+            _RECORD_HEADER.pack_into(self._data, position, WRAP_MARKER, 0)
+            tail += skip
+            position = 0
+
+        _RECORD_HEADER.pack_into(self._data, position, size, 0)
+        begin = position + RECORD_HEADER_SIZE
+        self._data[begin : begin + size] = data
+
+        self._tail = tail + record
+        self._store(TAIL_OFFSET, self._tail)
+        return True
+
+    # ----------------
+    # Consumer methods
+    # ----------------
+
+    def read_views(self) -> List[memoryview]:
+        """
+        Return views of all frames written since the last :meth:`release`.
+
+        .. warning::
+            The views are only valid until :meth:`release` is called.
+        """
+        capacity = self._capacity
+        data = self._data
+        head = self._read_to
+        tail = self._load(TAIL_OFFSET)
+
+        result = list()
+        while head < tail:
+            position = head % capacity
+            size = _RECORD_HEADER.unpack_from(data, position)[0]
+            if size == WRAP_MARKER:
+                head += capacity - position
+                continue
+            begin = position + RECORD_HEADER_SIZE
+            result.append(data[begin : begin + size])
+            head += record_size(size)
+
+        self._read_to = head
+        return result
+
+    def release(self) -> None:
+        """
+        Give the space of the frames returned by :meth:`read_views` back to the
+        producer.
+        """
+        self._head = self._read_to
+        self._store(HEAD_OFFSET, self._head)
+
+    def pending(self) -> bool:
+        """
+        Whether there are frames that have not been read yet.
+        """
+        return self._load(TAIL_OFFSET) != self._read_to
+
+
+def attach_shared_ring(shm: SharedMemory) -> SharedRing:
+    buffer = shm.buf
+    assert buffer is not None
+    return SharedRing(buffer)
+
+
+def create_shared_ring(size: int) -> SharedMemory:
+    """
+    Create a shared memory block of ``size`` data bytes and initialize a ring in it.
+    """
+    if size < RECORD_HEADER_SIZE:
+        raise ValueError(f"The 'size' argument must be at least {RECORD_HEADER_SIZE}")
+    shm = SharedMemory(create=True, size=HEADER_SIZE + align8(size))
+    try:
+        assert shm.buf is not None
+        SharedRing.initialize(shm.buf).release_buffer()
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    return shm
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Receiver script side of the shared memory transport.
+
+Example::
+
+    from async_receiver.receiver.shm_writer import ShmWriter
+
+    with ShmWriter() as writer:
+        while True:
+            writer.write(read_sensor())
+"""
+
+import os
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional
+
+from async_receiver.receiver.shm_ring import (
+    SHM_NAME_ENVIRON,
+    SharedRing,
+    attach_shared_ring,
+)
+
+NOTIFY_BYTE = b"\x01"
+
+
+def _untrack(shm: SharedMemory) -> None:
+    """
+    Attaching to a block registers it with this process' resource tracker, which
+    would unlink it when the receiver script exits. The parent owns the block.
+    """
+    if os.name != "posix":
+        return
+
+    from multiprocessing import resource_tracker
+
+    name = getattr(shm, "_name", None)
+    if name:
+        resource_tracker.unregister(name, "shared_memory")
+
+
+class ShmWriter:
+    """
+    Write frames into the ring created by the parent :class:`Receiver`.
+
+    The parent is woken up by writing one byte to ``notify_fd`` (stdout by default)
+    whenever a frame is written into a ring the parent had fully drained.
+    """
+
+    def __init__(self, name: Optional[str] = None, notify_fd=1):
+        shm_name = name if name else os.environ.get(SHM_NAME_ENVIRON)
+        if not shm_name:
+            raise ValueError(f"The '{SHM_NAME_ENVIRON}' environment variable is empty")
+
+        self._shm = SharedMemory(name=shm_name)
+        _untrack(self._shm)
+        self._ring = attach_shared_ring(self._shm)
+        self._notify_fd = notify_fd
+        self._written = 0
+
+    @property
+    def ring(self) -> SharedRing:
+        return self._ring
+
+    @property
+    def written(self) -> int:
+        return self._written
+
+    @property
+    def dropped(self) -> int:
+        return self._ring.dropped
+
+    def notify(self) -> None:
+        os.write(self._notify_fd, NOTIFY_BYTE)
+
+    def write(self, data: bytes) -> bool:
+        """
+        :return:
+            ``False`` if the ring was full and the frame was dropped.
+        """
+        previous_tail = self._ring.tail
+        if not self._ring.write(data):
+            return False
+        self._written += 1
+        if self._ring.head == previous_tail:
+            self.notify()
+        return True
+
+    def close(self) -> None:
+        self.notify()
+        self._ring.release_buffer()
+        self._shm.close()
+
+    def __enter__(self) -> "ShmWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
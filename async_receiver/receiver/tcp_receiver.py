@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+
+from asyncio import (
+    BaseTransport,
+    BufferedProtocol,
+    CancelledError,
+    Future,
+    Task,
+    TimeoutError,
+    Transport,
+    create_task,
+    get_running_loop,
+    shield,
+    sleep,
+    wait_for,
+)
+from typing import List, Optional, cast
+
+from async_receiver.receiver.receiver import Receiver
+from async_receiver.subprocess.async_subprocess import ReaderMethod
+
+PAUSE_READING_FRAMES = 4096
+"""Pause reading the socket while this many frames are waiting for delivery."""
+
+
+class _TcpProtocol(BufferedProtocol):
+    def __init__(self, receiver: "TcpReceiver"):
+        self._receiver = receiver
+        self._view = memoryview(bytearray(receiver.receive_byte))
+        self.lost: Future = get_running_loop().create_future()
+
+    def connection_made(self, transport: BaseTransport) -> None:
+        self._receiver._connection_made(cast(Transport, transport))
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self._view
+
+    def buffer_updated(self, nbytes: int) -> None:
+        self._receiver._feed(self._view[:nbytes])
+
+    def eof_received(self) -> Optional[bool]:
+        return False
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self._receiver._connection_lost()
+        if not self.lost.done():
+            self.lost.set_result(exc)
+
+
+class TcpReceiver(Receiver):
+    """
+    Receive frames from a TCP server inside the event loop, without a subprocess.
+
+    Incoming bytes are written by the transport directly into a preallocated
+    buffer of ``receive_byte`` bytes and split into frames according to
+    ``stdout_reader_method``. The connection is re-established with exponential
+    backoff until the receiver is closed.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        port: int,
+        *,
+        category: Optional[str] = "tcp",
+        name: Optional[str] = None,
+        reconnect_delay=0.1,
+        reconnect_max_delay=30.0,
+        connect_timeout: Optional[float] = None,
+        **kwargs,
+    ):
+        super().__init__(
+            category=category,
+            name=name if name else f"tcp://{address}:{port}",
+            address=address,
+            port=port,
+            **kwargs,
+        )
+
+        if reconnect_delay <= 0:
+            raise ValueError("The 'reconnect_delay' argument must be greater than 0")
+        if reconnect_max_delay < reconnect_delay:
+            raise ValueError(
+                "The 'reconnect_max_delay' argument must be "
+                "greater than or equal to 'reconnect_delay'"
+            )
+
+        if self._stdout_reader_method == ReaderMethod.ReadExactly:
+            if self._stdout_chunk_size < 1:
+                raise ValueError(
+                    "The 'stdout_chunk_size' argument must be greater than 0"
+                )
+        if self._stdout_reader_method == ReaderMethod.ReadFrames:
+            if self._stdout_codec is None:
+                raise ValueError("The 'ReadFrames' reader method requires a codec")
+
+        self._reconnect_delay = reconnect_delay
+        self._reconnect_max_delay = reconnect_max_delay
+        self._connect_timeout = connect_timeout
+
+        self._transport: Optional[Transport] = None
+        self._protocol: Optional[_TcpProtocol] = None
+        self._connect_task: Optional[Task] = None
+        self._pending = b""
+        self._frame_buffer = bytearray()
+        self._paused = False
+        self._reconnects = 0
+
+    @property
+    def receive_byte(self) -> int:
+        return self._receive_byte
+
+    @property
+    def connected(self) -> bool:
+        return self._transport is not None
+
+    @property
+    def reconnects(self) -> int:
+        return self._reconnects
+
+    @property
+    def opened(self) -> bool:
+        return self._connect_task is not None
+
+    def _split(self, view: memoryview) -> List[bytes]:
+        method = self._stdout_reader_method
+        if method == ReaderMethod.Read:
+            return [bytes(view)]
+        if method == ReaderMethod.ReadFrames:
+            assert self._stdout_codec is not None
+            self._frame_buffer += view
+            return self._stdout_codec.decode(self._frame_buffer)
+
+        data = self._pending + view
+        if method == ReaderMethod.ReadExactly:
+            size = self._stdout_chunk_size
+            end = len(data) - len(data) % size
+            self._pending = data[end:]
+            return [data[i : i + size] for i in range(0, end, size)]
+
+        separator = self._stdout_separator
+        chunks = data.split(separator)
+        self._pending = chunks.pop()
+        if method == ReaderMethod.ReadLines:
+            return chunks
+        return [chunk + separator for chunk in chunks]
+
+    def _connection_made(self, transport: Transport) -> None:
+        self._transport = transport
+        self._pending = b""
+        self._frame_buffer.clear()
+        self._paused = False
+
+    def _connection_lost(self) -> None:
+        self._transport = None
+        method = self._stdout_reader_method
+        if self._pending and method != ReaderMethod.ReadExactly:
+            self._enqueue_frames([self._pending])
+        self._pending = b""
+        if method == ReaderMethod.ReadFrames:
+            assert self._stdout_codec is not None
+            frames = self._stdout_codec.flush(self._frame_buffer)
+            if frames:
+                self._enqueue_frames(frames)
+
+    def _feed(self, view: memoryview) -> None:
+        frames = self._split(view)
+        if not frames:
+            return
+        backlog = self._enqueue_frames(frames)
+        if not self._paused and backlog >= PAUSE_READING_FRAMES:
+            if self._transport is not None:
+                self._transport.pause_reading()
+                self._paused = True
+
+    async def _deliver_frames(self) -> None:
+        try:
+            await super()._deliver_frames()
+        finally:
+            if self._paused:
+                self._paused = False
+                if self._transport is not None:
+                    self._transport.resume_reading()
+
+    async def _connect(self) -> _TcpProtocol:
+        loop = get_running_loop()
+        assert self._address is not None
+        assert self._port is not None
+        coro = loop.create_connection(
+            lambda: _TcpProtocol(self),
+            self._address,
+            self._port,
+        )
+        _, protocol = await wait_for(coro, self._connect_timeout)
+        return protocol
+
+    async def _reconnect_loop(self, protocol: _TcpProtocol) -> None:
+        delay = self._reconnect_delay
+        while True:
+            self._protocol = protocol
+            await shield(protocol.lost)
+            while True:
+                await sleep(delay)
+                try:
+                    protocol = await self._connect()
+                except (OSError, TimeoutError):
+                    delay = min(delay * 2, self._reconnect_max_delay)
+                else:
+                    self._reconnects += 1
+                    delay = self._reconnect_delay
+                    break
+
+    async def open(self) -> None:
+        if self._connect_task is not None:
+            raise RuntimeError("Already opened connection")
+
+        protocol = await self._connect()
+        self._protocol = protocol
+        self._connect_task = create_task(self._reconnect_loop(protocol))
+
+    async def close(self, timeout: Optional[float] = None) -> int:
+        if timeout is not None and timeout <= 0:
+            raise ValueError("The 'timeout' argument must be None or greater than 0")
+        if self._connect_task is None:
+            raise RuntimeError("Not ready connection")
+
+        self._connect_task.cancel()
+        try:
+            await self._connect_task
+        except CancelledError:
+            pass
+        finally:
+            self._connect_task = None
+
+        if self._transport is not None:
+            self._transport.close()
+        if self._protocol is not None:
+            await wait_for(shield(self._protocol.lost), timeout)
+            self._protocol = None
+        if self._deliver_task is not None:
+            await wait_for(shield(self._deliver_task), timeout)
+        await self._close_parse_stage()
+        return 0
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+import socket
+from asyncio import (
+    DatagramProtocol,
+    DatagramTransport,
+    Future,
+    Handle,
+    TimerHandle,
+    get_running_loop,
+    shield,
+    wait_for,
+)
+from ipaddress import ip_address
+from struct import pack
+from typing import Any, List, Optional, Tuple, Union, cast
+
+from async_receiver.receiver.receiver import Receiver
+
+
+class _UdpProtocol(DatagramProtocol):
+    def __init__(self, receiver: "UdpReceiver"):
+        self._receiver = receiver
+        self.lost: Future = get_running_loop().create_future()
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        self._receiver._datagram_received(data)
+
+    def error_received(self, exc: Exception) -> None:
+        self._receiver._error_received(exc)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        if not self.lost.done():
+            self.lost.set_result(exc)
+
+
+class UdpReceiver(Receiver):
+    """
+    Receive datagrams inside the event loop, without a subprocess.
+
+    Each datagram is one frame, so binary payloads are never re-framed.
+    Datagrams that arrive in the same loop iteration (or within
+    ``stdout_max_linger`` seconds, if set) are stored and dispatched as one batch.
+    If ``address`` is a multicast group, the socket joins that group on
+    ``multicast_interface``.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        port: int,
+        *,
+        category: Optional[str] = "udp",
+        name: Optional[str] = None,
+        multicast_interface="0.0.0.0",
+        **kwargs,
+    ):
+        super().__init__(
+            category=category,
+            name=name if name else f"udp://{address}:{port}",
+            address=address,
+            port=port,
+            **kwargs,
+        )
+
+        self._multicast_interface = multicast_interface
+        self._transport: Optional[DatagramTransport] = None
+        self._protocol: Optional[_UdpProtocol] = None
+        self._batch: List[bytes] = list()
+        self._flush_handle: Optional[Union[Handle, TimerHandle]] = None
+        self._errors = 0
+
+    @property
+    def is_multicast(self) -> bool:
+        assert self._address is not None
+        return ip_address(self._address).is_multicast
+
+    @property
+    def errors(self) -> int:
+        """
+        Number of errors reported by the socket.
+        """
+        return self._errors
+
+    @property
+    def opened(self) -> bool:
+        return self._transport is not None
+
+    @property
+    def local_address(self) -> Tuple[Any, ...]:
+        if self._transport is None:
+            raise RuntimeError("Not ready transport")
+        return self._transport.get_extra_info("sockname")
+
+    def _datagram_received(self, data: bytes) -> None:
+        batch = self._batch
+        batch.append(data)
+
+        max_batch_size = self._stdout_max_batch_size
+        if max_batch_size >= 1 and len(batch) >= max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            loop = get_running_loop()
+            if self._stdout_max_linger > 0.0:
+                linger = self._stdout_max_linger
+                self._flush_handle = loop.call_later(linger, self._flush)
+            else:
+                self._flush_handle = loop.call_soon(self._flush)
+
+    def _error_received(self, exc: Exception) -> None:
+        self._errors += 1
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._batch:
+            batch = self._batch
+            self._batch = list()
+            self._enqueue_frames(batch)
+
+    def _create_multicast_socket(self) -> socket.socket:
+        assert self._address is not None
+        assert self._port is not None
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(("", self._port))
+            membership = pack(
+                "4s4s",
+                socket.inet_aton(self._address),
+                socket.inet_aton(self._multicast_interface),
+            )
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+            sock.setblocking(False)
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    async def open(self) -> None:
+        if self._transport is not None:
+            raise RuntimeError("Already opened transport")
+
+        assert self._address is not None
+        assert self._port is not None
+
+        loop = get_running_loop()
+        if self.is_multicast:
+            transport, protocol = await loop.create_datagram_endpoint(
+                lambda: _UdpProtocol(self),
+                sock=self._create_multicast_socket(),
+            )
+        else:
+            transport, protocol = await loop.create_datagram_endpoint(
+                lambda: _UdpProtocol(self),
+                local_addr=(self._address, self._port),
+            )
+
+        self._transport = cast(DatagramTransport, transport)
+        self._protocol = protocol
+
+    async def close(self, timeout: Optional[float] = None) -> int:
+        if timeout is not None and timeout <= 0:
+            raise ValueError("The 'timeout' argument must be None or greater than 0")
+        if self._transport is None or self._protocol is None:
+            raise RuntimeError("Not ready transport")
+
+        self._transport.close()
+        await wait_for(shield(self._protocol.lost), timeout)
+        self._transport = None
+        self._protocol = None
+
+        self._flush()
+        if self._deliver_task is not None:
+            await wait_for(shield(self._deliver_task), timeout)
+        await self._close_parse_stage()
+        return 0
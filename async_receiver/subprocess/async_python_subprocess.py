@@ -7,12 +7,14 @@ from json import loads
 from typing import Dict, List, Mapping, Optional, Tuple
 
 from async_receiver.subprocess.async_subprocess import (
+    AnyReaderCallable,
     AsyncSubprocess,
     ReaderCallable,
     ReaderMethod,
     SubprocessMethod,
     start_async_subprocess,
 )
+from async_receiver.subprocess.framing import FrameCodec
 
 PROGRESS_BAR_STYLE_OFF = "off"
 PROGRESS_BAR_STYLE_ASCII = "ascii"
@@ -76,14 +78,20 @@ class AsyncPythonSubprocess:
         *subcommands,
         cwd: Optional[str] = None,
         writable=False,
-        stdout_callback: Optional[ReaderCallable] = None,
-        stderr_callback: Optional[ReaderCallable] = None,
+        stdout_callback: Optional[AnyReaderCallable] = None,
+        stderr_callback: Optional[AnyReaderCallable] = None,
         stdout_reader_method=ReaderMethod.ReadLine,
         stderr_reader_method=ReaderMethod.ReadLine,
         stdout_chunk_size=-1,
         stderr_chunk_size=-1,
         stdout_separator=b"\n",
         stderr_separator=b"\n",
+        stdout_max_batch_size=0,
+        stderr_max_batch_size=0,
+        stdout_max_linger=0.0,
+        stderr_max_linger=0.0,
+        stdout_codec: Optional[FrameCodec] = None,
+        stderr_codec: Optional[FrameCodec] = None,
     ) -> AsyncSubprocess:
         if not subcommands:
             ValueError("Empty subcommands arguments")
@@ -103,6 +111,12 @@ class AsyncPythonSubprocess:
             stderr_chunk_size=stderr_chunk_size,
             stdout_separator=stdout_separator,
             stderr_separator=stderr_separator,
+            stdout_max_batch_size=stdout_max_batch_size,
+            stderr_max_batch_size=stderr_max_batch_size,
+            stdout_max_linger=stdout_max_linger,
+            stderr_max_linger=stderr_max_linger,
+            stdout_codec=stdout_codec,
+            stderr_codec=stderr_codec,
         )
         return proc
 
@@ -3,10 +3,12 @@
 import sys
 from asyncio import (
     Task,
+    TimeoutError,
     create_subprocess_exec,
     create_subprocess_shell,
     create_task,
     gather,
+    get_running_loop,
     shield,
     subprocess,
     wait_for,
@@ -19,11 +21,28 @@ from inspect import iscoroutinefunction
 from io import BytesIO
 from signal import SIGINT
 from time import time
-from typing import Awaitable, Callable, Dict, Final, Mapping, Optional, Tuple, Union
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Final,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
 
 import psutil
 
+from async_receiver.subprocess.framing import FrameCodec, SeparatorCodec
+
 ReaderCallable = Callable[[bytes], Union[Awaitable[None], None]]
+BatchReaderCallable = Callable[[List[bytes]], Union[Awaitable[None], None]]
+AnyReaderCallable = Union[ReaderCallable, BatchReaderCallable]
+
+DEFAULT_READ_SIZE: Final[int] = 64 * 1024
 
 
 @unique
@@ -38,6 +57,17 @@ class ReaderMethod(Enum):
     ReadLine = 1
     ReadUntil = 2
     ReadExactly = 3
+    ReadLines = 4
+    """
+    Drain everything buffered in the :class:`StreamReader` and split it into frames
+    in one pass. The callback receives a ``List[bytes]`` of frames without the
+    trailing separator.
+    """
+    ReadFrames = 5
+    """
+    Like :attr:`ReadLines`, but frames are parsed by the
+    :class:`async_receiver.subprocess.framing.FrameCodec` of the stream.
+    """
 
 
 @unique
@@ -93,10 +123,16 @@ PROCESS_STATUS_MAP: Final[Dict[str, ProcessStatus]] = {
 
 @dataclass
 class ReaderConfig:
-    callback: Optional[ReaderCallable] = None
+    callback: Optional[AnyReaderCallable] = None
     reader_method: ReaderMethod = ReaderMethod.ReadLine
     chunk_size: int = -1
     separator: bytes = b"\n"
+    max_batch_size: int = 0
+    """Maximum number of frames per batch. Values less than 1 mean unlimited."""
+    max_linger: float = 0.0
+    """Seconds to wait for more frames before delivering an incomplete batch."""
+    codec: Optional[FrameCodec] = None
+    """Framing codec used by :attr:`ReaderMethod.ReadFrames`."""
 
 
 class AsyncSubprocess:
@@ -107,14 +143,20 @@ class AsyncSubprocess:
         env: Optional[Mapping[str, str]] = None,
         writable=False,
         method=SubprocessMethod.Exec,
-        stdout_callback: Optional[ReaderCallable] = None,
-        stderr_callback: Optional[ReaderCallable] = None,
+        stdout_callback: Optional[AnyReaderCallable] = None,
+        stderr_callback: Optional[AnyReaderCallable] = None,
         stdout_reader_method=ReaderMethod.ReadLine,
         stderr_reader_method=ReaderMethod.ReadLine,
         stdout_chunk_size=-1,
         stderr_chunk_size=-1,
         stdout_separator=b"\n",
         stderr_separator=b"\n",
+        stdout_max_batch_size=0,
+        stderr_max_batch_size=0,
+        stdout_max_linger=0.0,
+        stderr_max_linger=0.0,
+        stdout_codec: Optional[FrameCodec] = None,
+        stderr_codec: Optional[FrameCodec] = None,
     ):
         self._commands = commands
         self._cwd = cwd
@@ -127,21 +169,109 @@ class AsyncSubprocess:
             reader_method=stdout_reader_method,
             chunk_size=stdout_chunk_size,
             separator=stdout_separator,
+            max_batch_size=stdout_max_batch_size,
+            max_linger=stdout_max_linger,
+            codec=stdout_codec,
         )
         self._stderr_config = ReaderConfig(
             callback=stderr_callback,
             reader_method=stderr_reader_method,
             chunk_size=stderr_chunk_size,
             separator=stderr_separator,
+            max_batch_size=stderr_max_batch_size,
+            max_linger=stderr_max_linger,
+            codec=stderr_codec,
         )
 
+        for config in (self._stdout_config, self._stderr_config):
+            if config.reader_method == ReaderMethod.ReadFrames and not config.codec:
+                raise ValueError("The 'ReadFrames' reader method requires a codec")
+
         self._process: Optional[subprocess.Process] = None
         self._stdout_task: Optional[Task] = None
         self._stderr_task: Optional[Task] = None
 
+    @staticmethod
+    async def _frames_reader(
+        reader: StreamReader,
+        config: ReaderConfig,
+        codec: FrameCodec,
+    ) -> None:
+        assert config.callback is not None
+        callback = cast(BatchReaderCallable, config.callback)
+        read_size = config.chunk_size if config.chunk_size >= 1 else DEFAULT_READ_SIZE
+        max_batch_size = config.max_batch_size
+        max_linger = config.max_linger
+        loop = get_running_loop()
+
+        async def _deliver(batch: List[bytes]) -> None:
+            if iscoroutinefunction(callback):
+                await callback(batch)
+            else:
+                callback(batch)
+
+        buffer = bytearray()
+        frames: List[bytes] = list()
+        deadline = 0.0
+
+        while True:
+            if frames:
+                # Linger for more frames until the batch is full or time is up.
+                timeout = deadline - loop.time()
+                try:
+                    if timeout <= 0.0:
+                        raise TimeoutError
+                    data = await wait_for(reader.read(read_size), timeout)
+                except TimeoutError:
+                    await _deliver(frames)
+                    frames = list()
+                    continue
+            else:
+                data = await reader.read(read_size)
+
+            if not data:
+                frames += codec.flush(buffer)
+                break
+
+            buffer += data
+            decoded = codec.decode(buffer)
+            if not decoded:
+                continue
+
+            if not frames:
+                deadline = loop.time() + max_linger
+            frames += decoded
+
+            if max_batch_size >= 1:
+                while len(frames) >= max_batch_size:
+                    await _deliver(frames[:max_batch_size])
+                    frames = frames[max_batch_size:]
+
+            if frames and max_linger <= 0.0:
+                await _deliver(frames)
+                frames = list()
+
+        while frames:
+            if max_batch_size >= 1:
+                await _deliver(frames[:max_batch_size])
+                frames = frames[max_batch_size:]
+            else:
+                await _deliver(frames)
+                frames = list()
+
     @staticmethod
     async def _reader(reader: StreamReader, config: ReaderConfig) -> None:
         assert config.callback is not None
+        if config.reader_method == ReaderMethod.ReadLines:
+            codec = SeparatorCodec(config.separator)
+            await AsyncSubprocess._frames_reader(reader, config, codec)
+            return
+        if config.reader_method == ReaderMethod.ReadFrames:
+            assert config.codec is not None
+            await AsyncSubprocess._frames_reader(reader, config, config.codec)
+            return
+
+        callback = cast(ReaderCallable, config.callback)
         while not reader.at_eof():
             if config.reader_method == ReaderMethod.Read:
                 data = await reader.read(config.chunk_size)
@@ -154,10 +284,13 @@ class AsyncSubprocess:
             else:
                 assert False, "Inaccessible section"
 
-            if iscoroutinefunction(config.callback):
-                await config.callback(data)
+            if not data and reader.at_eof():
+                break
+
+            if iscoroutinefunction(callback):
+                await callback(data)
             else:
-                config.callback(data)
+                callback(data)
 
     @property
     def started(self) -> bool:
@@ -341,6 +474,9 @@ class AsyncSubprocess:
         interrupt=True,
         injury_time=0.1,
     ) -> int:
+        if self.process.returncode is not None:
+            return await self.wait(timeout, injury_time=injury_time)
+
         remain = timeout
 
         if interrupt is not None:
@@ -384,14 +520,20 @@ async def start_async_subprocess(
     env: Optional[Mapping[str, str]] = None,
     writable=False,
     method=SubprocessMethod.Exec,
-    stdout_callback: Optional[ReaderCallable] = None,
-    stderr_callback: Optional[ReaderCallable] = None,
+    stdout_callback: Optional[AnyReaderCallable] = None,
+    stderr_callback: Optional[AnyReaderCallable] = None,
     stdout_reader_method=ReaderMethod.ReadLine,
     stderr_reader_method=ReaderMethod.ReadLine,
     stdout_chunk_size=-1,
     stderr_chunk_size=-1,
     stdout_separator=b"\n",
     stderr_separator=b"\n",
+    stdout_max_batch_size=0,
+    stderr_max_batch_size=0,
+    stdout_max_linger=0.0,
+    stderr_max_linger=0.0,
+    stdout_codec: Optional[FrameCodec] = None,
+    stderr_codec: Optional[FrameCodec] = None,
 ) -> AsyncSubprocess:
     proc = AsyncSubprocess(
         *commands,
@@ -407,6 +549,12 @@ async def start_async_subprocess(
         stderr_chunk_size=stderr_chunk_size,
         stdout_separator=stdout_separator,
         stderr_separator=stderr_separator,
+        stdout_max_batch_size=stdout_max_batch_size,
+        stderr_max_batch_size=stderr_max_batch_size,
+        stdout_max_linger=stdout_max_linger,
+        stderr_max_linger=stderr_max_linger,
+        stdout_codec=stdout_codec,
+        stderr_codec=stderr_codec,
     )
     await proc.start()
     return proc
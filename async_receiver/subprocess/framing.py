@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+
+from typing import Final, List
+
+DEFAULT_MAX_FRAME_SIZE: Final[int] = 16 * 1024 * 1024
+
+SLIP_END: Final[int] = 0xC0
+SLIP_ESC: Final[int] = 0xDB
+SLIP_ESC_END: Final[int] = 0xDC
+SLIP_ESC_ESC: Final[int] = 0xDD
+
+
+class FrameCodec:
+    """
+    Incremental framing codec.
+
+    :meth:`decode` parses every complete frame at the beginning of ``buffer``,
+    removes the consumed bytes and leaves a trailing partial frame in place for
+    the next call. A partial frame is not an error.
+    """
+
+    def __init__(self):
+        self.errors = 0
+        """Number of malformed frames that were discarded."""
+
+    def decode(self, buffer: bytearray) -> List[bytes]:
+        raise NotImplementedError
+
+    def flush(self, buffer: bytearray) -> List[bytes]:
+        """
+        Called at the end of the stream with the remaining bytes.
+        """
+        buffer.clear()
+        return []
+
+    def encode(self, payload: bytes) -> bytes:
+        raise NotImplementedError
+
+
+class SeparatorCodec(FrameCodec):
+    """
+    Frames terminated by ``separator``. Frames do not include the separator.
+    """
+
+    def __init__(self, separator=b"\n"):
+        super().__init__()
+        if not separator:
+            raise ValueError("The 'separator' argument must not be empty")
+        self.separator = separator
+
+    def decode(self, buffer: bytearray) -> List[bytes]:
+        last = buffer.rfind(self.separator)
+        if last == -1:
+            return []
+        frames = bytes(buffer[:last]).split(self.separator)
+        del buffer[: last + len(self.separator)]
+        return frames
+
+    def flush(self, buffer: bytearray) -> List[bytes]:
+        frames = [bytes(buffer)] if buffer else []
+        buffer.clear()
+        return frames
+
+    def encode(self, payload: bytes) -> bytes:
+        return payload + self.separator
+
+
+class FixedSizeCodec(FrameCodec):
+    def __init__(self, size: int):
+        super().__init__()
+        if size < 1:
+            raise ValueError("The 'size' argument must be greater than 0")
+        self.size = size
+
+    def decode(self, buffer: bytearray) -> List[bytes]:
+        size = self.size
+        end = len(buffer) - len(buffer) % size
+        if end == 0:
+            return []
+        data = bytes(buffer[:end])
+        del buffer[:end]
+        return [data[i : i + size] for i in range(0, end, size)]
+
+    def encode(self, payload: bytes) -> bytes:
+        if len(payload) != self.size:
+            raise ValueError(f"The payload size must be {self.size}")
+        return payload
+
+
+class LengthPrefixCodec(FrameCodec):
+    """
+    Frames prefixed with a fixed-width unsigned integer length.
+    """
+
+    def __init__(
+        self,
+        width=4,
+        byteorder="big",
+        max_frame_size=DEFAULT_MAX_FRAME_SIZE,
+    ):
+        super().__init__()
+        if width not in (1, 2, 4, 8):
+            raise ValueError("The 'width' argument must be 1, 2, 4 or 8")
+        if byteorder not in ("big", "little"):
+            raise ValueError("The 'byteorder' argument must be 'big' or 'little'")
+        self.width = width
+        self.byteorder = byteorder
+        self.max_frame_size = max_frame_size
+
+    def decode(self, buffer: bytearray) -> List[bytes]:
+        width = self.width
+        byteorder = self.byteorder
+        total = len(buffer)
+        view = memoryview(buffer)
+        frames = list()
+        position = 0
+        try:
+            while position + width <= total:
+                size = int.from_bytes(view[position : position + width], byteorder)
+                if size > self.max_frame_size:
+                    raise ValueError(
+                        f"The frame size ({size}) exceeds the maximum frame size"
+                    )
+                begin = position + width
+                end = begin + size
+                if end > total:
+                    break
+                frames.append(bytes(view[begin:end]))
+                position = end
+        finally:
+            view.release()
+        del buffer[:position]
+        return frames
+
+    def encode(self, payload: bytes) -> bytes:
+        return len(payload).to_bytes(self.width, self.byteorder) + payload
+
+
+class VarintCodec(FrameCodec):
+    """
+    Frames prefixed with an unsigned LEB128 (protobuf style) varint length.
+    """
+
+    def __init__(self, max_frame_size=DEFAULT_MAX_FRAME_SIZE):
+        super().__init__()
+        self.max_frame_size = max_frame_size
+
+    def decode(self, buffer: bytearray) -> List[bytes]:
+        total = len(buffer)
+        view = memoryview(buffer)
+        frames = list()
+        position = 0
+        try:
+            while position < total:
+                size = 0
+                shift = 0
+                cursor = position
+                while cursor < total:
+                    byte = buffer[cursor]
+                    cursor += 1
+                    size |= (byte & 0x7F) << shift
+                    if byte < 0x80:
+                        break
+                    shift += 7
+                    if shift > 63:
+                        raise ValueError("The varint length prefix is too long")
+                else:
+                    break  # Partial length prefix
+
+                if size > self.max_frame_size:
+                    raise ValueError(
+                        f"The frame size ({size}) exceeds the maximum frame size"
+                    )
+                end = cursor + size
+                if end > total:
+                    break
+                frames.append(bytes(view[cursor:end]))
+                position = end
+        finally:
+            view.release()
+        del buffer[:position]
+        return frames
+
+    def encode(self, payload: bytes) -> bytes:
+        size = len(payload)
+        prefix = bytearray()
+        while size >= 0x80:
+            prefix.append((size & 0x7F) | 0x80)
+            size >>= 7
+        prefix.append(size)
+        return bytes(prefix) + payload
+
+
+class SlipCodec(FrameCodec):
+    """
+    RFC 1055 SLIP framing. Empty frames are ignored.
+    """
+
+    _END = bytes([SLIP_END])
+    _ESC_END = bytes([SLIP_ESC, SLIP_ESC_END])
+    _ESC_ESC = bytes([SLIP_ESC, SLIP_ESC_ESC])
+    _ESC = bytes([SLIP_ESC])
+
+    def decode(self, buffer: bytearray) -> List[bytes]:
+        last = buffer.rfind(self._END)
+        if last == -1:
+            return []
+        chunks = bytes(buffer[:last]).split(self._END)
+        del buffer[: last + 1]
+        return [
+            chunk.replace(self._ESC_END, self._END).replace(self._ESC_ESC, self._ESC)
+            for chunk in chunks
+            if chunk
+        ]
+
+    def encode(self, payload: bytes) -> bytes:
+        escaped = payload.replace(self._ESC, self._ESC_ESC)
+        escaped = escaped.replace(self._END, self._ESC_END)
+        return self._END + escaped + self._END
+
+
+def cobs_encode(payload: bytes) -> bytes:
+    result = bytearray()
+    for block in payload.split(b"\x00"):
+        while len(block) >= 0xFE:
+            result.append(0xFF)
+            result += block[:0xFE]
+            block = block[0xFE:]
+        result.append(len(block) + 1)
+        result += block
+    return bytes(result)
+
+
+def cobs_decode(data: bytes) -> bytes:
+    result = bytearray()
+    total = len(data)
+    position = 0
+    while position < total:
+        code = data[position]
+        if code == 0:
+            raise ValueError("Unexpected zero byte in COBS data")
+        end = position + code
+        if end > total:
+            raise ValueError("Truncated COBS block")
+        result += data[position + 1 : end]
+        position = end
+        if code < 0xFF and position < total:
+            result.append(0)
+    return bytes(result)
+
+
+class CobsCodec(FrameCodec):
+    """
+    Consistent Overhead Byte Stuffing, with frames terminated by a zero byte.
+    Malformed frames are discarded and counted in :attr:`errors`.
+    """
+
+    def decode(self, buffer: bytearray) -> List[bytes]:
+        last = buffer.rfind(b"\x00")
+        if last == -1:
+            return []
+        chunks = bytes(buffer[:last]).split(b"\x00")
+        del buffer[: last + 1]
+
+        frames = list()
+        for chunk in chunks:
+            if not chunk:
+                continue
+            try:
+                frames.append(cobs_decode(chunk))
+            except ValueError:
+                self.errors += 1
+        return frames
+
+    def encode(self, payload: bytes) -> bytes:
+        return cobs_encode(payload) + b"\x00"
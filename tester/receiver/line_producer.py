@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""
+Receiver script used by the tests.
+
+Writes ``receive_byte`` numbered lines to stdout and exits.
+"""
+
+import sys
+
+
+def main() -> None:
+    count = int(sys.argv[3])
+    for i in range(count):
+        sys.stdout.write(f"{i:063d}\n")
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
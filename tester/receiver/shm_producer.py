@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+"""
+Receiver script used by the tests.
+
+Writes ``receive_byte`` binary frames into the shared memory ring and exits.
+"""
+
+import sys
+
+from async_receiver.receiver.shm_writer import ShmWriter
+
+
+def main() -> None:
+    count = int(sys.argv[3])
+    with ShmWriter() as writer:
+        for i in range(count):
+            frame = i.to_bytes(4, "little") + b"\n\x00"
+            while not writer.write(frame):
+                pass
+
+
+if __name__ == "__main__":
+    main()
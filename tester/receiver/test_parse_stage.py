@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+from random import random
+from time import sleep
+from typing import Any, List
+from unittest import IsolatedAsyncioTestCase, main
+
+from async_receiver.receiver.parse_stage import ParseExecutor, ParseStage
+
+
+def parse_ints(frames: List[bytes]) -> List[Any]:
+    return [int(frame) for frame in frames]
+
+
+def parse_ints_slowly(frames: List[bytes]) -> List[Any]:
+    sleep(random() * 0.01)
+    return parse_ints(frames)
+
+
+class ParseStageTestCase(IsolatedAsyncioTestCase):
+    async def run_stage(self, stage: ParseStage, count: int, step: int) -> None:
+        for i in range(0, count, step):
+            await stage.put([str(n).encode() for n in range(i, min(i + step, count))])
+        await stage.flush()
+
+    async def test_order(self):
+        records: List[Any] = list()
+
+        async def _sink(batch: List[Any]) -> None:
+            records.extend(batch)
+
+        stage = ParseStage(
+            parse_ints_slowly,
+            _sink,
+            executor=ParseExecutor.Thread,
+            workers=4,
+            batch_size=7,
+        )
+        await self.run_stage(stage, 1000, 3)
+        self.assertEqual(list(range(1000)), records)
+        await self.run_stage(stage, 10, 10)
+        await stage.close()
+        self.assertEqual(list(range(1000)) + list(range(10)), records)
+
+    async def test_process_executor(self):
+        batches: List[List[Any]] = list()
+
+        async def _sink(batch: List[Any]) -> None:
+            batches.append(batch)
+
+        stage = ParseStage(parse_ints, _sink, workers=2, batch_size=100)
+        await self.run_stage(stage, 1000, 50)
+        await stage.close()
+        self.assertEqual(list(range(1000)), [r for batch in batches for r in batch])
+        self.assertTrue(all(len(batch) <= 100 for batch in batches))
+
+    async def test_parser_errors(self):
+        records: List[Any] = list()
+
+        async def _sink(batch: List[Any]) -> None:
+            records.extend(batch)
+
+        stage = ParseStage(
+            parse_ints,
+            _sink,
+            executor=ParseExecutor.Thread,
+            batch_size=2,
+        )
+        await stage.put([b"1", b"2", b"x", b"4", b"5"])
+        await stage.close()
+        self.assertEqual(1, stage.errors)
+        self.assertEqual([1, 2, 5], records)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+import os
+from collections import Counter
+from typing import List
+from unittest import IsolatedAsyncioTestCase, main
+
+from async_receiver.receiver.receive_manager import ReceiveManager, TaggedFrame
+from async_receiver.receiver.receiver import Receiver
+
+LINE_PRODUCER = os.path.join(os.path.dirname(__file__), "line_producer.py")
+
+
+class ReceiveManagerTestCase(IsolatedAsyncioTestCase):
+    async def test_fan_in(self):
+        manager = ReceiveManager()
+        receivers = [Receiver(name=f"r{i}") for i in range(500)]
+        for receiver in receivers:
+            manager.add(receiver)
+        self.assertEqual(500, len(manager))
+
+        for i in range(10):
+            for receiver in receivers:
+                await receiver._receiver_stdout(str(i).encode())
+
+        frames = await manager.get_many(100000, timeout=1.0)
+        self.assertEqual(5000, len(frames))
+        self.assertEqual(set(f"r{i}" for i in range(500)), set(k for k, _ in frames))
+        self.assertEqual(b"0", frames[0][1])
+        self.assertEqual(b"9", frames[-1][1])
+        self.assertEqual([], await manager.get_many(1, timeout=0.01))
+
+    async def test_duplicate_key(self):
+        manager = ReceiveManager()
+        manager.add(Receiver(name="a"))
+        with self.assertRaises(KeyError):
+            manager.add(Receiver(name="a"))
+        with self.assertRaises(ValueError):
+            manager.add(Receiver())
+
+    async def test_dropped(self):
+        manager = ReceiveManager(queue_maxsize=2)
+        receiver = Receiver(name="a")
+        manager.add(receiver)
+        for frame in (b"1", b"2", b"3"):
+            await receiver._receiver_stdout(frame)
+        self.assertEqual(1, manager.dropped)
+        self.assertEqual([("a", b"2"), ("a", b"3")], manager.pop_all_nowait())
+
+    async def test_open_close(self):
+        count = 100
+        manager = ReceiveManager()
+        for i in range(4):
+            receiver = Receiver(receiver_script=LINE_PRODUCER, receive_byte=count)
+            manager.add(receiver, key=f"producer{i}")
+
+        self.assertEqual({}, await manager.open(max_concurrency=2))
+        received: List[TaggedFrame] = list()
+        while len(received) < 4 * count:
+            received += await manager.get_many(1024, timeout=10.0)
+        exit_codes = await manager.close()
+        self.assertEqual({f"producer{i}": 0 for i in range(4)}, exit_codes)
+
+        counter = Counter(key for key, _ in received)
+        self.assertEqual({f"producer{i}": count for i in range(4)}, counter)
+
+        remain = [frame async for frame in manager]
+        self.assertEqual([], remain)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+import os
+from asyncio import sleep
+from typing import Any, List
+from unittest import IsolatedAsyncioTestCase, main
+
+from async_receiver.receiver.parse_stage import ParseExecutor
+from async_receiver.receiver.receiver import OverflowPolicy, Receiver
+from async_receiver.subprocess.async_subprocess import ReaderMethod
+
+LINE_PRODUCER = os.path.join(os.path.dirname(__file__), "line_producer.py")
+
+
+def parse_lines(frames: List[bytes]) -> List[Any]:
+    return [int(frame) for frame in frames]
+
+
+class ReceiverTestCase(IsolatedAsyncioTestCase):
+    async def test_queue_storage(self):
+        receiver = Receiver(queue_maxsize=2)
+        for frame in (b"1", b"2", b"3"):
+            await receiver._receiver_stdout(frame)
+        self.assertTrue(receiver.is_full())
+        self.assertEqual([b"2", b"3"], receiver.pop_all_nowait())
+        self.assertTrue(receiver.is_empty())
+
+    async def test_ring_storage(self):
+        receiver = Receiver(queue_maxsize=4, queue_maxbytes=8)
+        for frame in (b"aaa", b"bbb", b"ccc"):
+            await receiver._receiver_stdout(frame)
+        self.assertEqual(b"bbb", receiver.pop_nowait())
+        await receiver._receiver_stdout(b"dd")
+        self.assertEqual((b"cccdd", [3, 2]), receiver.pop_all_joined())
+        self.assertTrue(receiver.is_empty())
+
+    async def test_drop_newest(self):
+        receiver = Receiver(queue_maxsize=2, overflow_policy=OverflowPolicy.DropNewest)
+        for frame in (b"1", b"2", b"3", b"4"):
+            await receiver._receiver_stdout(frame)
+        self.assertEqual(2, receiver.dropped)
+        self.assertEqual([b"1", b"2"], receiver.pop_all_nowait())
+
+    async def test_ring_drop_newest(self):
+        receiver = Receiver(
+            queue_maxsize=8,
+            queue_maxbytes=4,
+            overflow_policy=OverflowPolicy.DropNewest,
+        )
+        for frame in (b"12", b"34", b"56"):
+            await receiver._receiver_stdout(frame)
+        self.assertEqual(1, receiver.dropped)
+        self.assertEqual([b"12", b"34"], receiver.pop_all_nowait())
+
+    async def test_coalesce_latest(self):
+        for queue_maxbytes in (0, 16):
+            receiver = Receiver(
+                queue_maxsize=8,
+                queue_maxbytes=queue_maxbytes,
+                overflow_policy=OverflowPolicy.CoalesceLatest,
+            )
+            for frame in (b"1", b"2", b"3"):
+                await receiver._receiver_stdout(frame)
+            self.assertEqual(2, receiver.dropped)
+            self.assertEqual([b"3"], receiver.pop_all_nowait())
+
+    async def open_block_receiver(self, **kwargs) -> List[bytes]:
+        count = 5000
+        receiver = Receiver(
+            receiver_script=LINE_PRODUCER,
+            receive_byte=count,
+            queue_maxsize=64,
+            overflow_policy=OverflowPolicy.Block,
+            **kwargs,
+        )
+        await receiver.open()
+        received: List[bytes] = list()
+        while len(received) < count:
+            received += receiver.pop_all_nowait()
+            await sleep(0.001)
+        self.assertEqual(0, await receiver.wait())
+        self.assertEqual(0, receiver.dropped)
+        self.assertLess(0, receiver.blocked)
+        return received
+
+    async def test_block(self):
+        received = await self.open_block_receiver()
+        self.assertEqual([f"{i:063d}\n".encode() for i in range(5000)], received)
+
+    async def test_block_ring_lines(self):
+        received = await self.open_block_receiver(
+            queue_maxbytes=4096,
+            stdout_reader_method=ReaderMethod.ReadLines,
+        )
+        self.assertEqual([f"{i:063d}".encode() for i in range(5000)], received)
+
+    async def test_parser(self):
+        for executor in (ParseExecutor.Thread, ParseExecutor.Process):
+            for reader_method in (ReaderMethod.ReadLine, ReaderMethod.ReadLines):
+                receiver = Receiver(
+                    receiver_script=LINE_PRODUCER,
+                    receive_byte=3000,
+                    queue_maxsize=4000,
+                    stdout_reader_method=reader_method,
+                    parser=parse_lines,
+                    parser_executor=executor,
+                    parser_workers=2,
+                    parser_batch_size=100,
+                )
+                await receiver.open()
+                self.assertEqual(0, await receiver.wait())
+                self.assertEqual(list(range(3000)), receiver.pop_all_nowait())
+                self.assertEqual(0, await receiver.close())
+
+    def test_parser_with_ring_storage(self):
+        with self.assertRaises(ValueError):
+            Receiver(queue_maxbytes=1024, parser=parse_lines)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+from asyncio import QueueEmpty
+from collections import deque
+from random import Random
+from unittest import TestCase, main
+
+from async_receiver.receiver.ring_buffer import RingBuffer
+
+
+class RingBufferTestCase(TestCase):
+    def test_put_get(self):
+        ring = RingBuffer(16, 4)
+        self.assertTrue(ring.empty())
+        self.assertEqual(0, ring.put_nowait(b"abc"))
+        self.assertEqual(0, ring.put_nowait(b"defg"))
+        self.assertEqual(2, ring.qsize())
+        self.assertEqual(7, ring.nbytes)
+        self.assertEqual(b"abc", ring.get_nowait())
+        self.assertEqual(b"defg", ring.get_nowait())
+        self.assertTrue(ring.empty())
+        with self.assertRaises(QueueEmpty):
+            ring.get_nowait()
+
+    def test_drop_oldest_by_frames(self):
+        ring = RingBuffer(1024, 2)
+        ring.put_nowait(b"1")
+        ring.put_nowait(b"2")
+        self.assertTrue(ring.full())
+        self.assertEqual(1, ring.put_nowait(b"3"))
+        self.assertEqual(1, ring.dropped)
+        self.assertEqual([b"2", b"3"], [bytes(v) for v in ring.get_all_views()])
+
+    def test_drop_oldest_by_bytes(self):
+        ring = RingBuffer(10, 100)
+        ring.put_nowait(b"aaaa")
+        ring.put_nowait(b"bbbb")
+        self.assertFalse(ring.fits(4))
+        self.assertEqual(1, ring.put_nowait(b"cccc"))
+        self.assertEqual(2, ring.put_nowait(b"dddddddddd"))
+        self.assertEqual(b"dddddddddd", ring.get_nowait())
+
+    def test_too_large(self):
+        ring = RingBuffer(4, 4)
+        with self.assertRaises(ValueError):
+            ring.put_nowait(b"12345")
+
+    def test_get_all_joined(self):
+        ring = RingBuffer(8, 8)
+        for frame in (b"ab", b"cde", b"f", b"ghij"):
+            ring.put_nowait(frame)
+        data, lengths = ring.get_all_joined()
+        self.assertEqual(b"fghij", data)
+        self.assertEqual([1, 4], lengths)
+        self.assertTrue(ring.empty())
+
+    def test_random_against_deque(self):
+        rand = Random(0)
+        ring = RingBuffer(64, 8)
+        expected: deque = deque()
+        for i in range(10000):
+            if rand.random() < 0.7:
+                frame = bytes([i % 256]) * rand.randint(0, 20)
+                ring.put_nowait(frame)
+                expected.append(frame)
+                while len(expected) > ring.qsize():
+                    expected.popleft()
+            elif expected:
+                self.assertEqual(expected.popleft(), ring.get_nowait())
+            self.assertEqual(len(expected), ring.qsize())
+            self.assertEqual(sum(map(len, expected)), ring.nbytes)
+        self.assertEqual(list(expected), [bytes(v) for v in ring.get_all_views()])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+import os
+from typing import List
+from unittest import IsolatedAsyncioTestCase, TestCase, main
+
+from async_receiver.receiver.receiver import OverflowPolicy, Receiver
+from async_receiver.receiver.shm_ring import (
+    SharedRing,
+    attach_shared_ring,
+    create_shared_ring,
+)
+
+SHM_PRODUCER = os.path.join(os.path.dirname(__file__), "shm_producer.py")
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+
+class SharedRingTestCase(TestCase):
+    def test_write_read(self):
+        ring = SharedRing.initialize(memoryview(bytearray(256 + 64)))
+        self.assertEqual(64, ring.capacity)
+        self.assertTrue(ring.write(b"abc"))
+        self.assertTrue(ring.write(b"\n" * 20))
+        views = ring.read_views()
+        self.assertEqual([b"abc", b"\n" * 20], [bytes(v) for v in views])
+        ring.release()
+        self.assertEqual([], ring.read_views())
+
+    def test_full_and_wrap(self):
+        ring = SharedRing.initialize(memoryview(bytearray(256 + 64)))
+        self.assertTrue(ring.write(b"1" * 16))  # 24 bytes
+        self.assertTrue(ring.write(b"2" * 16))  # 48 bytes
+        self.assertFalse(ring.write(b"3" * 16))
+        self.assertEqual(1, ring.dropped)
+
+        self.assertEqual(2, len(ring.read_views()))
+        ring.release()
+        self.assertTrue(ring.write(b"4" * 16))  # Wrap around
+        self.assertEqual([b"4" * 16], [bytes(v) for v in ring.read_views()])
+
+    def test_shared_memory(self):
+        shm = create_shared_ring(1024)
+        try:
+            writer = attach_shared_ring(shm)
+            reader = attach_shared_ring(shm)
+            writer.write(b"hello")
+            self.assertEqual([b"hello"], [bytes(v) for v in reader.read_views()])
+            reader.release()
+            self.assertEqual(writer.tail, writer.head)
+            writer.release_buffer()
+            reader.release_buffer()
+        finally:
+            shm.close()
+            shm.unlink()
+
+
+class ShmReceiverTestCase(IsolatedAsyncioTestCase):
+    async def run_receiver(self, **kwargs) -> List[bytes]:
+        count = 10000
+        env = dict(os.environ)
+        env["PYTHONPATH"] = ROOT_DIR
+        receiver = Receiver(
+            receiver_script=SHM_PRODUCER,
+            receive_byte=count,
+            env=env,
+            queue_maxsize=count,
+            shm_size=4096,
+            shm_poll_interval=0.01,
+            **kwargs,
+        )
+        await receiver.open()
+        self.assertEqual(0, await receiver.wait())
+        self.assertEqual(0, await receiver.close())
+        received = receiver.pop_all_nowait()
+        expected = [i.to_bytes(4, "little") + b"\n\x00" for i in range(count)]
+        self.assertEqual(expected, received)
+        return received
+
+    async def test_queue_storage(self):
+        await self.run_receiver()
+
+    async def test_ring_storage(self):
+        await self.run_receiver(
+            queue_maxbytes=10000 * 6,
+            overflow_policy=OverflowPolicy.Block,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+from asyncio import Event, StreamReader, StreamWriter, sleep, start_server
+from typing import List
+from unittest import IsolatedAsyncioTestCase, main
+
+from async_receiver.receiver.receive_manager import ReceiveManager
+from async_receiver.receiver.tcp_receiver import TcpReceiver
+from async_receiver.subprocess.async_subprocess import ReaderMethod
+from async_receiver.subprocess.framing import SlipCodec
+
+
+class TcpReceiverTestCase(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.connections = 0
+        self.payloads = [b"a\nbb\n", b"cc", b"c\n"]
+        self.done = Event()
+
+        async def _handler(reader: StreamReader, writer: StreamWriter) -> None:
+            self.connections += 1
+            for payload in self.payloads:
+                writer.write(payload)
+                await writer.drain()
+                await sleep(0.01)
+            if self.connections >= 2:
+                await self.done.wait()
+            writer.close()
+
+        self.server = await start_server(_handler, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.done.set()
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def receive(self, receiver: TcpReceiver, count: int) -> List[bytes]:
+        await receiver.open()
+        received: List[bytes] = list()
+        for _ in range(500):
+            received += receiver.pop_all_nowait()
+            if len(received) >= count:
+                break
+            await sleep(0.01)
+        self.assertEqual(0, await receiver.close())
+        return received
+
+    async def test_reconnect(self):
+        receiver = TcpReceiver(
+            "127.0.0.1",
+            self.port,
+            stdout_reader_method=ReaderMethod.ReadLines,
+            reconnect_delay=0.01,
+        )
+        received = await self.receive(receiver, 6)
+        self.assertEqual([b"a", b"bb", b"ccc"] * 2, received)
+        self.assertEqual(1, receiver.reconnects)
+        self.assertFalse(receiver.opened)
+
+    async def test_read_exactly(self):
+        receiver = TcpReceiver(
+            "127.0.0.1",
+            self.port,
+            stdout_reader_method=ReaderMethod.ReadExactly,
+            stdout_chunk_size=3,
+            receive_byte=2,
+        )
+        received = await self.receive(receiver, 3)
+        self.assertEqual([b"a\nb", b"b\nc", b"cc\n"], received[:3])
+
+    async def test_read_frames(self):
+        codec = SlipCodec()
+        data = codec.encode(b"\n\xc0") + codec.encode(b"xyz")
+        self.payloads = [data[:3], data[3:]]
+        receiver = TcpReceiver(
+            "127.0.0.1",
+            self.port,
+            stdout_reader_method=ReaderMethod.ReadFrames,
+            stdout_codec=codec,
+            receive_byte=4,
+        )
+        received = await self.receive(receiver, 2)
+        self.assertEqual([b"\n\xc0", b"xyz"], received[:2])
+
+    async def test_discover_tcp(self):
+        manager = ReceiveManager(tcp=True, tcp_endpoints=[("127.0.0.1", self.port)])
+        receivers = manager.discover()
+        self.assertEqual(1, len(receivers))
+        self.assertIn(f"tcp://127.0.0.1:{self.port}", manager)
+        self.assertEqual({}, await manager.open())
+        frames = await manager.get_many(3, timeout=10.0)
+        self.assertEqual(f"tcp://127.0.0.1:{self.port}", frames[0][0])
+        self.assertEqual(b"a\n", frames[0][1])
+        await manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+import socket
+from asyncio import sleep
+from typing import List
+from unittest import IsolatedAsyncioTestCase, main
+
+from async_receiver.receiver.receive_manager import ReceiveManager
+from async_receiver.receiver.udp_receiver import UdpReceiver
+
+
+class UdpReceiverTestCase(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    async def asyncTearDown(self):
+        self.sender.close()
+
+    async def receive(self, receiver: UdpReceiver, count: int) -> List[bytes]:
+        received: List[bytes] = list()
+        for _ in range(500):
+            received += receiver.pop_all_nowait()
+            if len(received) >= count:
+                break
+            await sleep(0.01)
+        return received
+
+    async def test_binary_batch(self):
+        receiver = UdpReceiver("127.0.0.1", 0, stdout_max_linger=0.05)
+        await receiver.open()
+        port = receiver.local_address[1]
+
+        payloads = [bytes([i, 10, 0, 13]) * (i + 1) for i in range(50)]
+        for payload in payloads:
+            self.sender.sendto(payload, ("127.0.0.1", port))
+
+        self.assertEqual(payloads, await self.receive(receiver, len(payloads)))
+        self.assertEqual(0, await receiver.close())
+        self.assertFalse(receiver.opened)
+
+    async def test_max_batch_size(self):
+        receiver = UdpReceiver("127.0.0.1", 0, stdout_max_batch_size=4)
+        await receiver.open()
+        port = receiver.local_address[1]
+        for i in range(10):
+            self.sender.sendto(str(i).encode(), ("127.0.0.1", port))
+        received = await self.receive(receiver, 10)
+        self.assertEqual([str(i).encode() for i in range(10)], received)
+        await receiver.close()
+
+    async def test_multicast(self):
+        receiver = UdpReceiver("239.255.0.1", 0)
+        try:
+            await receiver.open()
+        except OSError as e:
+            self.skipTest(f"Multicast is not available: {e}")
+        self.assertTrue(receiver.is_multicast)
+        await receiver.close()
+
+    async def test_discover_udp(self):
+        manager = ReceiveManager(udp=True, udp_endpoints=[("127.0.0.1", 0)])
+        receivers = manager.discover()
+        self.assertIsInstance(receivers[0], UdpReceiver)
+        self.assertEqual({}, await manager.open())
+        self.assertEqual({"udp://127.0.0.1:0": 0}, await manager.close())
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,11 @@ from sys import executable, version_info
 from typing import List
 from unittest import IsolatedAsyncioTestCase, main
 
-from async_receiver.subprocess.async_subprocess import start_async_subprocess
+from async_receiver.subprocess.async_subprocess import (
+    ReaderMethod,
+    start_async_subprocess,
+)
+from async_receiver.subprocess.framing import LengthPrefixCodec
 
 
 class AsyncSubprocessTestCase(IsolatedAsyncioTestCase):
@@ -50,6 +54,73 @@ class AsyncSubprocessTestCase(IsolatedAsyncioTestCase):
         result = await self.run_python_version(async_reader)
         self.assertEqual(expected_python_version, result)
 
+    async def run_python_lines(self, code: str, **kwargs) -> List[List[bytes]]:
+        batches: List[List[bytes]] = list()
+        proc = await start_async_subprocess(
+            executable,
+            "-c",
+            code,
+            stdout_callback=batches.append,
+            stdout_reader_method=ReaderMethod.ReadLines,
+            **kwargs,
+        )
+        self.assertEqual(0, await proc.wait())
+        self.assertTrue(proc.done_stdout())
+        return batches
+
+    async def test_read_lines(self):
+        code = "import sys; sys.stdout.write(''.join(f'{i}\\n' for i in range(1000)))"
+        batches = await self.run_python_lines(code)
+        frames = [frame for batch in batches for frame in batch]
+        self.assertEqual([str(i).encode() for i in range(1000)], frames)
+        self.assertLess(len(batches), len(frames))
+
+    async def test_read_lines_max_batch_size(self):
+        code = "print('\\n'.join(str(i) for i in range(100)), end='')"
+        batches = await self.run_python_lines(code, stdout_max_batch_size=7)
+        frames = [frame for batch in batches for frame in batch]
+        self.assertEqual([str(i).encode() for i in range(100)], frames)
+        self.assertTrue(all(len(batch) <= 7 for batch in batches))
+
+    async def test_read_lines_max_linger(self):
+        code = (
+            "import sys, time\n"
+            "for i in range(5):\n"
+            "    sys.stdout.write(f'{i}\\n')\n"
+            "    sys.stdout.flush()\n"
+            "    time.sleep(0.01)\n"
+        )
+        batches = await self.run_python_lines(code, stdout_max_linger=10.0)
+        self.assertEqual([[b"0", b"1", b"2", b"3", b"4"]], batches)
+
+    async def test_read_frames(self):
+        code = (
+            "import sys\n"
+            "for i in range(300):\n"
+            "    payload = bytes([i % 256, 10, 0]) * i\n"
+            "    sys.stdout.buffer.write(len(payload).to_bytes(4, 'big') + payload)\n"
+        )
+        batches: List[List[bytes]] = list()
+        proc = await start_async_subprocess(
+            executable,
+            "-c",
+            code,
+            stdout_callback=batches.append,
+            stdout_reader_method=ReaderMethod.ReadFrames,
+            stdout_codec=LengthPrefixCodec(),
+        )
+        self.assertEqual(0, await proc.wait())
+        frames = [frame for batch in batches for frame in batch]
+        self.assertEqual([bytes([i % 256, 10, 0]) * i for i in range(300)], frames)
+
+    async def test_read_frames_without_codec(self):
+        with self.assertRaises(ValueError):
+            await start_async_subprocess(
+                executable,
+                "--version",
+                stdout_reader_method=ReaderMethod.ReadFrames,
+            )
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+from typing import List
+from unittest import TestCase, main
+
+from async_receiver.subprocess.framing import (
+    CobsCodec,
+    FixedSizeCodec,
+    FrameCodec,
+    LengthPrefixCodec,
+    SeparatorCodec,
+    SlipCodec,
+    VarintCodec,
+    cobs_decode,
+    cobs_encode,
+)
+
+PAYLOADS = [
+    b"a",
+    b"\x00",
+    b"\n\r\n",
+    bytes([0xC0, 0xDB, 0xDC, 0xDD]),
+    bytes(range(256)),
+    b"\x00" * 300,
+    bytes(1000),
+]
+
+
+class FramingTestCase(TestCase):
+    def feed(self, codec: FrameCodec, data: bytes, step: int) -> List[bytes]:
+        buffer = bytearray()
+        frames: List[bytes] = list()
+        for i in range(0, len(data), step):
+            buffer += data[i : i + step]
+            frames += codec.decode(buffer)
+        frames += codec.flush(buffer)
+        self.assertEqual(0, len(buffer))
+        return frames
+
+    def assert_round_trip(self, codec: FrameCodec, payloads: List[bytes]) -> None:
+        data = b"".join(codec.encode(p) for p in payloads)
+        for step in (1, 3, 64, len(data)):
+            self.assertEqual(payloads, self.feed(codec, data, step))
+
+    def test_length_prefix(self):
+        for width in (2, 4, 8):
+            for byteorder in ("big", "little"):
+                codec = LengthPrefixCodec(width, byteorder)
+                self.assert_round_trip(codec, PAYLOADS + [b""])
+
+    def test_length_prefix_max_frame_size(self):
+        codec = LengthPrefixCodec(max_frame_size=4)
+        with self.assertRaises(ValueError):
+            codec.decode(bytearray(codec.encode(b"12345")))
+
+    def test_varint(self):
+        codec = VarintCodec()
+        self.assertEqual(b"\xac\x02", codec.encode(bytes(300))[:2])
+        self.assert_round_trip(codec, PAYLOADS + [b""])
+
+    def test_slip(self):
+        self.assert_round_trip(SlipCodec(), PAYLOADS)
+
+    def test_cobs(self):
+        for payload in PAYLOADS + [b"", bytes(range(1, 255)) * 3]:
+            encoded = cobs_encode(payload)
+            self.assertNotIn(0, encoded)
+            self.assertEqual(payload, cobs_decode(encoded))
+        self.assert_round_trip(CobsCodec(), PAYLOADS)
+
+    def test_cobs_errors(self):
+        codec = CobsCodec()
+        buffer = bytearray(b"\x05ab\x00" + codec.encode(b"ok"))
+        self.assertEqual([b"ok"], codec.decode(buffer))
+        self.assertEqual(1, codec.errors)
+
+    def test_separator(self):
+        codec = SeparatorCodec(b"\r\n")
+        self.assertEqual([b"a", b"b", b"c"], self.feed(codec, b"a\r\nb\r\nc", 1))
+
+    def test_fixed_size(self):
+        codec = FixedSizeCodec(3)
+        self.assertEqual([b"abc", b"def"], self.feed(codec, b"abcdefg", 2))
+        with self.assertRaises(ValueError):
+            codec.encode(b"ab")
+
+
+if __name__ == "__main__":
+    main()